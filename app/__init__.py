@@ -1 +0,0 @@
-from app.routes import auth, users, categories, expenses, budgets
\ No newline at end of file
@@ -0,0 +1,91 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from app.core.stats import wait_percentiles
+
+class BoundedExecutor:
+    """Bounded thread pool for running blocking calls off the event loop
+
+    Tracks how many calls are waiting for a worker thread and how long
+    they waited, so pool saturation is visible.
+    """
+
+    def __init__(self, max_workers: int, name: str = "executor", sample_size: int = 1024):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._started = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_samples = deque(maxlen=sample_size)
+
+    def _dequeue(self, queued: list):
+        # Called with the lock held by whichever of _call and run comes first
+        if queued[0]:
+            queued[0] = False
+            self._queued -= 1
+
+    def _call(self, queued: list, submitted: float, fn, *args, **kwargs):
+        """Run fn on a worker thread, recording its queue wait"""
+        waited = time.perf_counter() - submitted
+        with self._lock:
+            self._dequeue(queued)
+            self._active += 1
+            self._started += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._wait_samples.append(waited)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    async def run(self, fn, *args, **kwargs):
+        """Run a blocking function in the pool and await its result
+
+        The call runs in a copy of the caller's context, so context variables
+        (e.g. the request profile) are visible on the worker thread. A call
+        cancelled while still queued never runs and leaves the queue count.
+        """
+        queued = [True]
+        with self._lock:
+            self._queued += 1
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        try:
+            return await loop.run_in_executor(
+                self._pool, partial(context.run, self._call, queued, time.perf_counter(), fn, *args, **kwargs)
+            )
+        finally:
+            with self._lock:
+                self._dequeue(queued)
+
+    def stats(self) -> dict:
+        """Return queue depth, utilization and wait-time metrics"""
+        with self._lock:
+            samples = list(self._wait_samples)
+            started = self._started
+            stats = {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queue_depth": self._queued,
+                "completed": self._completed,
+                "wait_ms_avg": round(self._wait_total / started * 1000, 3) if started else 0.0,
+                "wait_ms_max": round(self._wait_max * 1000, 3),
+            }
+        stats.update(wait_percentiles(samples))
+        return stats
+
+    def shutdown(self):
+        """Stop accepting work and wait for running calls to finish"""
+        self._pool.shutdown(wait=True)
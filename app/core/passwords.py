@@ -0,0 +1,87 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+@lru_cache(maxsize=None)
+def get_context(rounds: int):
+    """Return the bcrypt CryptContext for a cost factor"""
+    # passlib is imported on first use to keep startup fast
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+def hash_password(password: str, rounds: int) -> str:
+    """Hash a password with the given bcrypt cost"""
+    return get_context(rounds).hash(password)
+
+def verify_and_update(password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    """Verify a password, returning a new hash if the stored one uses another cost"""
+    context = get_context(rounds)
+    if not context.verify(password, hashed_password):
+        return False, None
+    if context.needs_update(hashed_password) or get_rounds(hashed_password) != rounds:
+        return True, context.hash(password)
+    return True, None
+
+def get_rounds(hashed_password: str) -> Optional[int]:
+    """Extract the cost factor from a bcrypt hash ("$2b$12$...")"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+class PasswordHasher:
+    """Runs bcrypt in a process pool so hashing never blocks the event loop
+
+    At most max_pending calls may be queued or running; beyond that callers
+    get a 429 instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._pool = None
+        self._pending = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Created on first use; spawn avoids forking a process with running threads
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent authentication requests, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the configured cost"""
+        return await self._run(hash_password, password, self.rounds)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also return a rehash if the stored cost is outdated"""
+        return await self._run(verify_and_update, password, hashed_password, self.rounds)
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "pending": self._pending, "max_pending": self.max_pending}
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
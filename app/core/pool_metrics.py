@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.stats import wait_percentiles
+
+class PoolMetrics:
+    """Counters and checkout wait-time samples for one connection pool"""
+
+    def __init__(self, sample_size: int = 1024):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self._wait_max = 0.0
+        self._wait_samples = deque(maxlen=sample_size)
+
+    def record_wait(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            self._wait_max = max(self._wait_max, waited)
+            self._wait_samples.append(waited)
+            if timed_out:
+                self.timeouts += 1
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict:
+        """Return counters and checkout wait-time percentiles"""
+        with self._lock:
+            samples = list(self._wait_samples)
+            stats = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_ms_max": round(self._wait_max * 1000, 3),
+            }
+        stats.update(wait_percentiles(samples))
+        return stats
+
+def timed_pool_class(pool_class, metrics: PoolMetrics):
+    """Subclass a pool class so the time spent waiting for a connection is recorded
+
+    Pool events fire only once a connection has been handed out, so the wait
+    itself is measured around the pool's internal get.
+    """
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = pool_class._do_get(self)
+        except PoolTimeoutError:
+            metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        metrics.record_wait(time.perf_counter() - started)
+        return connection
+    
+    return type(f"Timed{pool_class.__name__}", (pool_class,), {"_do_get": _do_get})
+
+def instrument_pool(engine, metrics: PoolMetrics):
+    """Count connects, checkouts, checkins and invalidations via pool events"""
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.increment("connects")
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.increment("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.increment("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.increment("invalidations")
+
+def pool_status(engine, metrics: PoolMetrics, max_overflow: Optional[int] = None) -> dict:
+    """Return current pool occupancy together with the recorded metrics
+
+    max_overflow is the configured limit; pools do not expose it publicly.
+    """
+    pool = engine.pool
+    status = {"class": type(pool).__name__}
+    # Occupancy is only available on queue-based pools
+    if hasattr(pool, "checkedout"):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+        if max_overflow is not None:
+            status["max_overflow"] = max_overflow
+    status.update(metrics.stats())
+    return status
@@ -0,0 +1,216 @@
+import asyncio
+import hmac
+import os
+import random
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+# Profile of the request being handled; None outside profiled requests
+current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+class RequestProfile:
+    """Statement count, database time and phase timings for one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.phases = {}
+        self.handler_finished = None
+        self.profile_file = None
+
+    def add_phase(self, name: str, elapsed: float):
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def server_timing(self, finished: float) -> str:
+        """Render the Server-Timing header value"""
+        queries = "query" if self.statements == 1 else "queries"
+        metrics = [f'db;dur={self.db_time * 1000:.2f};desc="{self.statements} {queries}"']
+        for name, elapsed in self.phases.items():
+            metrics.append(f"{name};dur={elapsed * 1000:.2f}")
+        if self.handler_finished is not None:
+            metrics.append(f"serialize;dur={(finished - self.handler_finished) * 1000:.2f}")
+        metrics.append(f"total;dur={(finished - self.started) * 1000:.2f}")
+        if self.profile_file:
+            metrics.append(f'profile;desc="{self.profile_file}"')
+        return ", ".join(metrics)
+
+@contextmanager
+def profile_phase(name: str):
+    """Add the time spent in the block to a phase of the current request's profile"""
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_phase(name, time.perf_counter() - started)
+
+def instrument_queries(engine):
+    """Count statements and time spent executing them against the current request's profile"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_profile.get() is not None:
+            conn.info.setdefault("profile_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = current_profile.get()
+        started = conn.info.get("profile_query_started")
+        if profile is not None and started:
+            profile.statements += 1
+            profile.db_time += time.perf_counter() - started.pop()
+
+class ProfiledRoute(APIRoute):
+    """Route class that records the endpoint's own run time as the "handler" phase
+
+    Everything after the endpoint returns (response validation, encoding,
+    rendering) is reported as serialization by ProfilingMiddleware.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The request handler looks up dependant.call per request, and was
+        # built for the original, so the wrapper must keep it sync or async
+        endpoint = self.dependant.call
+        if asyncio.iscoroutinefunction(endpoint):
+            @wraps(endpoint)
+            async def timed_endpoint(*args, **kwargs):
+                try:
+                    with profile_phase("handler"):
+                        return await endpoint(*args, **kwargs)
+                finally:
+                    _mark_handler_finished()
+        else:
+            @wraps(endpoint)
+            def timed_endpoint(*args, **kwargs):
+                try:
+                    with profile_phase("handler"):
+                        return endpoint(*args, **kwargs)
+                finally:
+                    _mark_handler_finished()
+        self.dependant.call = timed_endpoint
+
+def _mark_handler_finished():
+    profile = current_profile.get()
+    if profile is not None:
+        profile.handler_finished = time.perf_counter()
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+class _CProfiler:
+    # cProfile sees everything running on the event loop thread, including
+    # other requests interleaved with this one
+    def __init__(self):
+        import cProfile
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def stop(self):
+        self._profiler.disable()
+
+    def dump(self, path: str) -> str:
+        path += ".prof"
+        self._profiler.dump_stats(path)
+        return path
+
+class _PyInstrumentProfiler:
+    # Optional dependency; async mode attributes time to this request's task only
+    def __init__(self):
+        from pyinstrument import Profiler
+        self._profiler = Profiler(async_mode="enabled")
+        self._profiler.start()
+
+    def stop(self):
+        self._profiler.stop()
+
+    def dump(self, path: str) -> str:
+        path += ".html"
+        with open(path, "w") as f:
+            f.write(self._profiler.output_html())
+        return path
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling each HTTP request
+
+    Statements, database time and phases are reported in a Server-Timing
+    header. Requests sending the token in the trigger header or picked at
+    sample_rate also run under a profiler whose output is written to
+    profile_dir, off the event loop, and named in the header. Without a
+    token the header is ignored and only sampling profiles. Only one
+    request is profiled at a time. Timing stops when the response starts,
+    so streamed bodies are not included.
+    """
+
+    def __init__(self, app, header: str = "X-Profile", token: Optional[str] = None, sample_rate: float = 0.0,
+                 profiler: str = "cprofile", profile_dir: str = "profiles"):
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}'; use one of {', '.join(PROFILERS)}")
+        self.app = app
+        self.header = header.lower().encode()
+        self.token = token
+        self.sample_rate = sample_rate
+        self.profiler_class = _CProfiler if profiler == "cprofile" else _PyInstrumentProfiler
+        self.profile_dir = profile_dir
+        self._profiling = False
+
+    def _wants_profile(self, scope) -> bool:
+        if self._profiling:
+            return False
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == self.header and hmac.compare_digest(value, self.token.encode()):
+                    return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _dump(self, profiler, scope) -> str:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method']}-{slug}-{uuid.uuid4().hex[:8]}"
+        return os.path.basename(profiler.dump(os.path.join(self.profile_dir, name)))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        profile = RequestProfile()
+        profiler = None
+        if self._wants_profile(scope):
+            self._profiling = True
+            profiler = self.profiler_class()
+        
+        async def send_with_timing(message):
+            nonlocal profiler
+            if message["type"] == "http.response.start":
+                finished = time.perf_counter()
+                if profiler is not None:
+                    profiler.stop()
+                    # Writing the profile is blocking file I/O
+                    profile.profile_file = await asyncio.get_running_loop().run_in_executor(
+                        None, self._dump, profiler, scope
+                    )
+                    profiler = None
+                    self._profiling = False
+                MutableHeaders(scope=message).append("Server-Timing", profile.server_timing(finished))
+            await send(message)
+        
+        context_token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(context_token)
+            if profiler is not None:
+                profiler.stop()
+                self._profiling = False
@@ -0,0 +1,9 @@
+from typing import Iterable
+
+def wait_percentiles(samples: Iterable[float]) -> dict:
+    """Return p50/p95/p99 of wait times in seconds as wait_ms_p* milliseconds"""
+    samples = sorted(samples)
+    return {
+        name: round(samples[int(quantile * (len(samples) - 1))] * 1000, 3) if samples else 0.0
+        for name, quantile in (("wait_ms_p50", 0.5), ("wait_ms_p95", 0.95), ("wait_ms_p99", 0.99))
+    }
@@ -1,23 +1,175 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from typing import Optional
 
-# Load environment variables
-load_dotenv()
+from app.config import settings
+from app.core.executor import BoundedExecutor
+from app.core.pool_metrics import PoolMetrics, instrument_pool, pool_status, timed_pool_class
+from app.core.profiling import instrument_queries
 
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
+# Async drivers used for each backend when serving requests
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_async_database_url(url: str) -> str:
+    """Translate a sync database URL into the matching async driver URL"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+def _pool_options(pool_class, metrics: PoolMetrics) -> dict:
+    """Engine keyword arguments for a sized, instrumented connection pool"""
+    return {
+        "poolclass": timed_pool_class(pool_class, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+# Engines and the executor are created by init_engines(), called from the
+# app's lifespan or by commands, so importing this module has no side effects.
+# Session factories exist up front and are bound once the engines do.
+engine = None
+async_engine = None
+db_executor = None
+serving_pool = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,  # Returned ORM objects are serialized after the session is done
+)
+
+def init_engines(database_url: Optional[str] = None):
+    """Create the engines (and the executor in threadpool mode); returns the sync engine
+
+    Does nothing if they already exist. Pool and execution settings come
+    from settings; the URL defaults to settings.DATABASE_URL.
+    """
+    global engine, async_engine, db_executor, serving_pool
+    if engine is not None:
+        return engine
+    
+    database_url = database_url or settings.DATABASE_URL
+    if settings.DB_EXECUTION_MODE not in ("async", "threadpool"):
+        raise ValueError(f"Unknown DB_EXECUTION_MODE '{settings.DB_EXECUTION_MODE}'")
+    
+    # Sync engine for migrations, maintenance commands and threadpool mode
+    engine_pool_metrics = PoolMetrics()
+    engine = create_engine(database_url, **_pool_options(QueuePool, engine_pool_metrics))
+    instrument_pool(engine, engine_pool_metrics)
+    if settings.PROFILING_ENABLED:
+        instrument_queries(engine)
+    SessionLocal.configure(bind=engine)
+    
+    if settings.DB_EXECUTION_MODE == "async":
+        # Async engine used by the API so queries never block the event loop
+        async_engine_pool_metrics = PoolMetrics()
+        async_engine = create_async_engine(
+            get_async_database_url(database_url),
+            **_pool_options(AsyncAdaptedQueuePool, async_engine_pool_metrics)
+        )
+        instrument_pool(async_engine.sync_engine, async_engine_pool_metrics)
+        if settings.PROFILING_ENABLED:
+            instrument_queries(async_engine.sync_engine)
+        AsyncSessionLocal.configure(bind=async_engine)
+        serving_pool = (async_engine.sync_engine, async_engine_pool_metrics)
+    else:
+        # Sync sessions whose calls run in a thread pool sized to the connection pool
+        db_executor = BoundedExecutor(
+            settings.DB_THREADPOOL_SIZE or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+            name="db"
+        )
+        serving_pool = (engine, engine_pool_metrics)
+    
+    return engine
+
+async def dispose_engines():
+    """Wait for in-flight calls on the executor, then close all pooled connections"""
+    global engine, async_engine, db_executor, serving_pool
+    if db_executor is not None:
+        db_executor.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
+    engine = async_engine = db_executor = serving_pool = None
 
 Base = declarative_base()
 
-# Dependency
-def get_db():
+def get_pool_status() -> dict:
+    """Occupancy and checkout metrics of the connection pool serving requests"""
+    return pool_status(*serving_pool, max_overflow=settings.DB_MAX_OVERFLOW)
+
+class ThreadPoolSession:
+    """Awaitable facade over a sync Session that runs every call on db_executor
+
+    Exposes the subset of the AsyncSession API used by routes, so they work
+    unchanged in either execution mode.
+    """
+
+    def __init__(self, session: Session, executor: BoundedExecutor):
+        self.sync_session = session
+        self._executor = executor
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await self._executor.run(fn, self.sync_session, *args, **kwargs)
+
+    async def get(self, entity, ident):
+        return await self._executor.run(self.sync_session.get, entity, ident)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await self._executor.run(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def close(self):
+        await self._executor.run(self.sync_session.close)
+
+async def stream_rows(statement, batch_size: int = 1000):
+    """Yield the rows of a SELECT in batches through a server-side cursor
+
+    Uses its own session so the stream can outlive the request's
+    dependencies, e.g. inside a StreamingResponse.
+    """
+    statement = statement.execution_options(yield_per=batch_size)
+    
+    if db_executor is None:
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(statement)
+            async for partition in result.partitions():
+                yield partition
+        return
+    
     db = SessionLocal()
     try:
-        yield db
+        partitions = (await db_executor.run(db.execute, statement)).partitions()
+        while True:
+            partition = await db_executor.run(next, partitions, None)
+            if partition is None:
+                break
+            yield partition
     finally:
-        db.close()
\ No newline at end of file
+        await db_executor.run(db.close)
+
+# Dependency; run sync service functions with `await db.run_sync(service, ...)`
+async def get_db():
+    if db_executor is not None:
+        # Like the async sessions, keep returned objects loaded after commit
+        db = ThreadPoolSession(SessionLocal(expire_on_commit=False), db_executor)
+        try:
+            yield db
+        finally:
+            await db.close()
+        return
+    
+    async with AsyncSessionLocal() as db:
+        yield db
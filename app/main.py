@@ -1,20 +1,18 @@
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+
+from fastapi import APIRouter, FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
-from sqlalchemy.orm import Session
-
-from app.database import engine, Base, get_db
-from app.routes import auth, users, categories, expenses, budgets
+from sqlalchemy.ext.asyncio import AsyncSession
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-# Initialize FastAPI app
-app = FastAPI(
-    title="Expense Tracker API",
-    description="API for tracking personal expenses, categorizing spending, and managing budgets",
-    version="1.0.0",
-)
+from app import database
+from app.config import settings
+from app.core.profiling import ProfiledRoute, ProfilingMiddleware
+from app.database import get_db
+from app.routes import auth, users, categories, expenses, budgets, dashboard
+from app.services.analytics_cache import analytics_cache
+from app.utils.security import user_cache, password_hasher
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 # Configure CORS
 origins = [
@@ -24,31 +22,82 @@ origins = [
     # Add production URLs when deployed
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router, prefix="/api")
-app.include_router(users.router, prefix="/api")
-app.include_router(categories.router, prefix="/api")
-app.include_router(expenses.router, prefix="/api")
-app.include_router(budgets.router, prefix="/api")
-
-@app.get("/")
+router = APIRouter(route_class=ProfiledRoute)
+
+@router.get("/")
 async def root():
     return {"message": "Welcome to the Expense Tracker API. Visit /docs for API documentation."}
 
-@app.get("/api/health")
-async def health_check(db: Session = Depends(get_db)):
+@router.get("/api/health")
+async def health_check(db: AsyncSession = Depends(get_db)):
     """Health check endpoint to verify API and database connection"""
     try:
         # Simple database query to check connection
-        db.execute(text("SELECT 1"))
-        return {"status": "healthy", "database": "connected"}
+        await db.execute(text("SELECT 1"))
+        health = {
+            "status": "healthy",
+            "database": "connected",
+            "pool": database.get_pool_status(),
+            "user_cache": user_cache.stats(),
+            "analytics_cache": analytics_cache.stats(),
+            "password_hasher": password_hasher.stats(),
+        }
+        if database.db_executor is not None:
+            health["executor"] = database.db_executor.stats()
+        return health
     except Exception as e:
-        return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
\ No newline at end of file
+        return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the database engines on startup; on shutdown drain and dispose them
+
+    Tables are not created here; run `python -m app.tools.bootstrap` first.
+    """
+    database.init_engines()
+    yield
+    await database.dispose_engines()
+    password_hasher.shutdown()
+
+def create_app() -> FastAPI:
+    """Build the API application; nothing connects to the database until startup"""
+    app = FastAPI(
+        title="Expense Tracker API",
+        description="API for tracking personal expenses, categorizing spending, and managing budgets",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+    
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Server-Timing"],
+    )
+    
+    # Added last so it is outermost and its total covers the whole stack
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(
+            ProfilingMiddleware,
+            header=settings.PROFILING_HEADER,
+            token=settings.PROFILING_TOKEN,
+            sample_rate=settings.PROFILING_SAMPLE_RATE,
+            profiler=settings.PROFILER,
+            profile_dir=settings.PROFILING_DIR,
+        )
+    
+    # Include routers
+    app.include_router(router)
+    app.include_router(auth.router, prefix="/api")
+    app.include_router(users.router, prefix="/api")
+    app.include_router(categories.router, prefix="/api")
+    app.include_router(expenses.router, prefix="/api")
+    app.include_router(budgets.router, prefix="/api")
+    app.include_router(dashboard.router, prefix="/api")
+    
+    return app
+
+# For `uvicorn app.main:app`; `uvicorn --factory app.main:create_app` also works
+app = create_app()
\ No newline at end of file
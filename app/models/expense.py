@@ -1,11 +1,19 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
 
 class Expense(Base):
+    # On PostgreSQL the migrations partition this table by month on date, with
+    # primary key (id, date); see app.tools.partitions
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_user_id_date", "user_id", "date",
+              postgresql_include=["amount", "category_id"]),
+        Index("ix_expenses_user_id_category_id_date", "user_id", "category_id", "date",
+              postgresql_include=["amount"]),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     amount = Column(Float, nullable=False)
@@ -24,4 +32,21 @@ class Expense(Base):
 
     # Relationships
     user = relationship("User", back_populates="expenses")
-    category = relationship("Category", back_populates="expenses")
\ No newline at end of file
+    category = relationship("Category", back_populates="expenses")
+
+# Full-text search, PostgreSQL only: a generated tsvector column with a GIN
+# index, and a trigram index on the same text for substring and fuzzy matches.
+# Queries must use SEARCH_TEXT verbatim (unqualified, so only when selecting
+# from expenses alone) for the trigram index to apply.
+SEARCH_CONFIG = "english"
+SEARCH_TEXT = "coalesce(description, '') || ' ' || coalesce(note, '')"
+SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE expenses ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+    f"(to_tsvector('{SEARCH_CONFIG}', {SEARCH_TEXT})) STORED",
+    "CREATE INDEX ix_expenses_search_vector ON expenses USING gin (search_vector)",
+    f"CREATE INDEX ix_expenses_search_text_trgm ON expenses USING gin (({SEARCH_TEXT}) gin_trgm_ops)",
+]
+
+for statement in SEARCH_DDL:
+    event.listen(Expense.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
\ No newline at end of file
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, Date
+
+from app.database import Base
+
+class ExpenseDailyRollup(Base):
+    """Per user, category and day aggregate of expenses, kept in sync by the expense service"""
+    __tablename__ = "expense_daily_rollups"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    
+    # Aggregates over the expenses of that day
+    total = Column(Float, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+    min_amount = Column(Float, nullable=True)
+    max_amount = Column(Float, nullable=True)
@@ -1,21 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.profiling import ProfiledRoute
 from app.database import get_db
 from app.schemas.user import Token, User
 from app.services.auth import authenticate_user, create_user_token
 from app.utils.security import get_current_user
 
-router = APIRouter(tags=["authentication"])
+router = APIRouter(tags=["authentication"], route_class=ProfiledRoute)
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login endpoint that returns a JWT token"""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
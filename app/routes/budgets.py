@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
+from app.core.profiling import ProfiledRoute
 from app.database import get_db
 from app.schemas.budget import Budget, BudgetCreate, BudgetUpdate, BudgetProgress
 from app.schemas.user import User
@@ -9,75 +10,91 @@ from app.services.budget import (
     get_budgets, get_budget, create_budget, update_budget, delete_budget,
     get_budget_progress, get_all_budget_progress
 )
+from app.services.analytics_cache import analytics_cache
+from app.utils.etag import user_data_etag
+from app.utils.pagination import NEXT_CURSOR_HEADER, next_cursor
 from app.utils.security import get_current_user
 
 router = APIRouter(
     prefix="/budgets",
-    tags=["budgets"]
+    tags=["budgets"],
+    route_class=ProfiledRoute
 )
 
-@router.get("/", response_model=List[Budget])
+@router.get("/", response_model=List[Budget], dependencies=[Depends(user_data_etag)])
 async def read_budgets(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
     active_only: bool = False,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get budgets for the current user"""
-    return get_budgets(db, current_user.id, skip, limit, active_only)
+    budgets = await db.run_sync(get_budgets, current_user.id, skip, limit, active_only, cursor=cursor)
+    cursor_value = next_cursor(budgets, limit, lambda b: (b.start_date, b.id))
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
+    return budgets
 
 @router.get("/progress", response_model=List[BudgetProgress])
 async def read_all_budget_progress(
     active_only: bool = True,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    data_version: int = Depends(user_data_etag),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get progress information for all budgets"""
-    return get_all_budget_progress(db, current_user.id, active_only)
+    return await analytics_cache.get_or_compute(
+        db, current_user.id, "budgets.progress",
+        {"active_only": active_only},
+        lambda: db.run_sync(get_all_budget_progress, current_user.id, active_only),
+        version=data_version
+    )
 
 @router.get("/{budget_id}", response_model=Budget)
 async def read_budget(
     budget_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific budget by ID"""
-    return get_budget(db, budget_id, current_user.id)
+    return await db.run_sync(get_budget, budget_id, current_user.id)
 
 @router.get("/{budget_id}/progress", response_model=BudgetProgress)
 async def read_budget_progress(
     budget_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get progress information for a specific budget"""
-    return get_budget_progress(db, budget_id, current_user.id)
+    return await db.run_sync(get_budget_progress, budget_id, current_user.id)
 
 @router.post("/", response_model=Budget, status_code=status.HTTP_201_CREATED)
 async def create_new_budget(
     budget_data: BudgetCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new budget"""
-    return create_budget(db, budget_data, current_user.id)
+    return await db.run_sync(create_budget, budget_data, current_user.id)
 
 @router.put("/{budget_id}", response_model=Budget)
 async def update_existing_budget(
     budget_id: int,
     budget_data: BudgetUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an existing budget"""
-    return update_budget(db, budget_id, budget_data, current_user.id)
+    return await db.run_sync(update_budget, budget_id, budget_data, current_user.id)
 
 @router.delete("/{budget_id}")
 async def delete_existing_budget(
     budget_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a budget"""
-    return delete_budget(db, budget_id, current_user.id)
\ No newline at end of file
+    return await db.run_sync(delete_budget, budget_id, current_user.id)
\ No newline at end of file
@@ -1,61 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 
+from app.core.profiling import ProfiledRoute
 from app.database import get_db
-from app.schemas.category import Category, CategoryCreate, CategoryUpdate
+from app.schemas.category import (
+    Category, CategoryWithStats, CategoryCreate, CategoryUpdate, CategoryMerge, CategoryMergeResult
+)
 from app.schemas.user import User
-from app.services.category import get_categories, get_category, create_category, update_category, delete_category
+from app.services.category import (
+    get_categories, get_category, create_category, update_category, delete_category, merge_category,
+    CATEGORY_SORTS
+)
+from app.utils.etag import user_data_etag
+from app.utils.pagination import NEXT_CURSOR_HEADER, next_cursor
 from app.utils.security import get_current_user
 
 router = APIRouter(
     prefix="/categories",
-    tags=["categories"]
+    tags=["categories"],
+    route_class=ProfiledRoute
 )
 
-@router.get("/", response_model=List[Category])
+@router.get(
+    "/",
+    response_model=Union[List[CategoryWithStats], List[Category]],
+    dependencies=[Depends(user_data_etag)]
+)
 async def read_categories(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
+    include_stats: bool = False,
+    sort: str = Query("id", regex="^(id|usage|total)$"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all categories for the current user"""
-    return get_categories(db, current_user.id, skip, limit)
+    """Get all categories for the current user, optionally with usage stats"""
+    if sort != "id" and not include_stats:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Sorting by usage or total requires include_stats"
+        )
+    
+    categories = await db.run_sync(
+        get_categories, current_user.id, skip, limit,
+        cursor=cursor, include_stats=include_stats, sort=sort
+    )
+    
+    sort_key = CATEGORY_SORTS[sort]
+    cursor_value = next_cursor(
+        categories, limit,
+        (lambda c: (c.id,)) if sort_key is None else (lambda c: (getattr(c, sort_key[0]), c.id))
+    )
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
+    return categories
 
 @router.get("/{category_id}", response_model=Category)
 async def read_category(
     category_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific category by ID"""
-    return get_category(db, category_id, current_user.id)
+    return await db.run_sync(get_category, category_id, current_user.id)
 
 @router.post("/", response_model=Category, status_code=status.HTTP_201_CREATED)
 async def create_new_category(
     category_data: CategoryCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new category"""
-    return create_category(db, category_data, current_user.id)
+    return await db.run_sync(create_category, category_data, current_user.id)
 
 @router.put("/{category_id}", response_model=Category)
 async def update_existing_category(
     category_id: int,
     category_data: CategoryUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an existing category"""
-    return update_category(db, category_id, category_data, current_user.id)
+    return await db.run_sync(update_category, category_id, category_data, current_user.id)
 
 @router.delete("/{category_id}")
 async def delete_existing_category(
     category_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a category"""
-    return delete_category(db, category_id, current_user.id)
\ No newline at end of file
+    return await db.run_sync(delete_category, category_id, current_user.id)
+
+@router.post("/{category_id}/merge", response_model=CategoryMergeResult)
+async def merge_existing_category(
+    category_id: int,
+    merge_data: CategoryMerge,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Move all expenses and budgets into another category and delete this one"""
+    return await db.run_sync(merge_category, category_id, merge_data.target_category_id, current_user.id)
\ No newline at end of file
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.profiling import ProfiledRoute
+from app.database import get_db
+from app.schemas.dashboard import Dashboard
+from app.schemas.user import User
+from app.services.analytics_cache import analytics_cache
+from app.services.dashboard import get_dashboard
+from app.utils.etag import user_data_etag
+from app.utils.security import get_current_user
+
+router = APIRouter(
+    prefix="/dashboard",
+    tags=["dashboard"],
+    route_class=ProfiledRoute
+)
+
+@router.get("/", response_model=Dashboard)
+async def read_dashboard(
+    months: int = Query(12, ge=1, le=60),
+    current_user: User = Depends(get_current_user),
+    data_version: int = Depends(user_data_etag),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get expense summary, per-category and monthly totals and budget progress in one call"""
+    return await analytics_cache.get_or_compute(
+        db, current_user.id, "dashboard",
+        {"months": months},
+        lambda: db.run_sync(get_dashboard, current_user.id, months),
+        version=data_version
+    )
@@ -1,105 +1,271 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import datetime
 
-from app.database import get_db
+from app.config import settings
+from app.core.profiling import ProfiledRoute
+from app.database import get_db, stream_rows
 from app.schemas.expense import (
-    Expense, ExpenseCreate, ExpenseUpdate, 
-    ExpenseSummary, CategoryExpenseSummary, TimePeriodExpenseSummary
+    Expense, ExpenseCreate, ExpenseUpdate, ExpenseSearchResult,
+    ExpenseSummary, CategoryExpenseSummary, TimePeriodExpenseSummary, ExpenseBulkResult,
+    ExpenseSelection, ExpenseBulkUpdate, ExpenseBulkUpdateResult, ExpenseBulkDeleteResult
 )
 from app.schemas.user import User
 from app.services.expense import (
-    get_expenses, get_expense, create_expense, update_expense, delete_expense,
-    get_expense_summary, get_expenses_by_category, get_monthly_expenses
+    get_expenses, search_expenses, get_expense, create_expense, update_expense, delete_expense,
+    get_expense_summary, get_expenses_by_category, get_monthly_expenses, bulk_create_expenses,
+    get_expense_export_query, get_expense_timeseries, bulk_update_expenses, bulk_delete_expenses,
+    EXPORT_COLUMNS
 )
+from app.services.analytics_cache import analytics_cache
+from app.utils.csv_io import read_csv_records, format_csv, format_ndjson
+from app.utils.etag import user_data_etag
+from app.utils.pagination import NEXT_CURSOR_HEADER, next_cursor
+from app.utils.periods import UTCDateTime
 from app.utils.security import get_current_user
 
 router = APIRouter(
     prefix="/expenses",
-    tags=["expenses"]
+    tags=["expenses"],
+    route_class=ProfiledRoute
 )
 
-@router.get("/", response_model=List[Expense])
+@router.get("/", response_model=List[Expense], dependencies=[Depends(user_data_etag)])
 async def read_expenses(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
     category_id: Optional[int] = None,
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
+    start_date: Optional[UTCDateTime] = None,
+    end_date: Optional[UTCDateTime] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get expenses for the current user with optional filters"""
-    return get_expenses(
-        db, current_user.id, skip, limit, 
+    expenses = await db.run_sync(
+        get_expenses, current_user.id, skip, limit, 
         category_id=category_id, 
         start_date=start_date, 
-        end_date=end_date
+        end_date=end_date,
+        cursor=cursor
+    )
+    cursor_value = next_cursor(expenses, limit, lambda e: (e.date, e.id))
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
+    return expenses
+
+@router.get("/search", response_model=List[ExpenseSearchResult], dependencies=[Depends(user_data_etag)])
+async def search_user_expenses(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    category_id: Optional[int] = None,
+    start_date: Optional[UTCDateTime] = None,
+    end_date: Optional[UTCDateTime] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search expense descriptions and notes, best matches first"""
+    expenses = await db.run_sync(
+        search_expenses, current_user.id, q, limit,
+        category_id=category_id,
+        start_date=start_date,
+        end_date=end_date,
+        cursor=cursor
     )
+    cursor_value = next_cursor(expenses, limit, lambda e: (e.rank, e.id))
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
+    return expenses
 
 @router.get("/summary", response_model=ExpenseSummary)
 async def read_expense_summary(
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
+    start_date: Optional[UTCDateTime] = None,
+    end_date: Optional[UTCDateTime] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    data_version: int = Depends(user_data_etag),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get expense summary statistics"""
-    return get_expense_summary(db, current_user.id, start_date, end_date)
+    return await analytics_cache.get_or_compute(
+        db, current_user.id, "expenses.summary",
+        {"start_date": start_date, "end_date": end_date},
+        lambda: db.run_sync(get_expense_summary, current_user.id, start_date, end_date),
+        version=data_version
+    )
 
 @router.get("/by-category", response_model=List[CategoryExpenseSummary])
 async def read_expenses_by_category(
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
+    start_date: Optional[UTCDateTime] = None,
+    end_date: Optional[UTCDateTime] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    data_version: int = Depends(user_data_etag),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get expenses grouped by category"""
-    return get_expenses_by_category(db, current_user.id, start_date, end_date)
+    return await analytics_cache.get_or_compute(
+        db, current_user.id, "expenses.by_category",
+        {"start_date": start_date, "end_date": end_date},
+        lambda: db.run_sync(get_expenses_by_category, current_user.id, start_date, end_date),
+        version=data_version
+    )
 
 @router.get("/monthly", response_model=List[TimePeriodExpenseSummary])
 async def read_monthly_expenses(
     months: int = Query(12, ge=1, le=60),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    data_version: int = Depends(user_data_etag),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get monthly expense summaries"""
-    return get_monthly_expenses(db, current_user.id, months)
+    return await analytics_cache.get_or_compute(
+        db, current_user.id, "expenses.monthly",
+        {"months": months},
+        lambda: db.run_sync(get_monthly_expenses, current_user.id, months),
+        version=data_version
+    )
+
+@router.get("/timeseries", response_model=List[TimePeriodExpenseSummary])
+async def read_expense_timeseries(
+    granularity: str = Query("month", regex="^(day|week|month|year)$"),
+    start_date: Optional[UTCDateTime] = None,
+    end_date: Optional[UTCDateTime] = None,
+    category_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    data_version: int = Depends(user_data_etag),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get gap-free expense summaries per calendar day, week, month or year"""
+    return await analytics_cache.get_or_compute(
+        db, current_user.id, "expenses.timeseries",
+        {"granularity": granularity, "start_date": start_date, "end_date": end_date, "category_id": category_id},
+        lambda: db.run_sync(
+            get_expense_timeseries, current_user.id, granularity,
+            start_date=start_date, end_date=end_date, category_id=category_id
+        ),
+        version=data_version
+    )
+
+@router.get("/export")
+async def export_expenses(
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    category_id: Optional[int] = None,
+    start_date: Optional[UTCDateTime] = None,
+    end_date: Optional[UTCDateTime] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream all matching expenses as CSV or NDJSON"""
+    statement = get_expense_export_query(
+        current_user.id,
+        category_id=category_id,
+        start_date=start_date,
+        end_date=end_date
+    )
+    
+    async def generate():
+        if format == "csv":
+            yield format_csv([EXPORT_COLUMNS])
+        async for rows in stream_rows(statement):
+            yield format_csv(rows) if format == "csv" else format_ndjson(EXPORT_COLUMNS, rows)
+    
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="expenses.{format}"'}
+    )
 
 @router.get("/{expense_id}", response_model=Expense)
 async def read_expense(
     expense_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific expense by ID"""
-    return get_expense(db, expense_id, current_user.id)
+    return await db.run_sync(get_expense, expense_id, current_user.id)
 
 @router.post("/", response_model=Expense, status_code=status.HTTP_201_CREATED)
 async def create_new_expense(
     expense_data: ExpenseCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new expense"""
-    return create_expense(db, expense_data, current_user.id)
+    return await db.run_sync(create_expense, expense_data, current_user.id)
+
+@router.post("/bulk", response_model=ExpenseBulkResult)
+async def create_expenses_bulk(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Import many expenses from a JSON array or a CSV body (Content-Type: text/csv).
+
+    CSV needs a header row with the expense field names. Valid rows are
+    inserted in one transaction; invalid rows are reported by position.
+    """
+    too_many_rows = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"At most {settings.BULK_IMPORT_MAX_ROWS} expenses can be imported at once"
+    )
+    
+    if request.headers.get("content-type", "").startswith("text/csv"):
+        records = []
+        async for record in read_csv_records(request.stream()):
+            records.append(record)
+            if len(records) > settings.BULK_IMPORT_MAX_ROWS:
+                raise too_many_rows
+    else:
+        try:
+            records = await request.json()
+        except ValueError:
+            records = None
+        if not isinstance(records, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a JSON array of expenses or a text/csv body"
+            )
+        if len(records) > settings.BULK_IMPORT_MAX_ROWS:
+            raise too_many_rows
+    
+    return await db.run_sync(bulk_create_expenses, records, current_user.id)
+
+@router.patch("/bulk", response_model=ExpenseBulkUpdateResult)
+async def update_expenses_bulk(
+    data: ExpenseBulkUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Apply the same changes to all expenses selected by ids and/or filters"""
+    return await db.run_sync(bulk_update_expenses, data, current_user.id)
+
+@router.delete("/bulk", response_model=ExpenseBulkDeleteResult)
+async def delete_expenses_bulk(
+    selection: ExpenseSelection,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete all expenses selected by ids and/or filters"""
+    return await db.run_sync(bulk_delete_expenses, selection, current_user.id)
 
 @router.put("/{expense_id}", response_model=Expense)
 async def update_existing_expense(
     expense_id: int,
     expense_data: ExpenseUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an existing expense"""
-    return update_expense(db, expense_id, expense_data, current_user.id)
+    return await db.run_sync(update_expense, expense_id, expense_data, current_user.id)
 
 @router.delete("/{expense_id}")
 async def delete_existing_expense(
     expense_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete an expense"""
-    return delete_expense(db, expense_id, current_user.id)
\ No newline at end of file
+    return await db.run_sync(delete_expense, expense_id, current_user.id)
\ No newline at end of file
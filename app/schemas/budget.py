@@ -2,12 +2,14 @@ from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
+from app.utils.periods import UTCDateTime
+
 class BudgetBase(BaseModel):
     amount: float = Field(..., gt=0)
     name: str
     description: Optional[str] = None
-    start_date: datetime
-    end_date: datetime
+    start_date: UTCDateTime
+    end_date: UTCDateTime
     category_id: Optional[int] = None  # None for overall budget
 
 class BudgetCreate(BudgetBase):
@@ -17,8 +19,8 @@ class BudgetUpdate(BaseModel):
     amount: Optional[float] = Field(None, gt=0)
     name: Optional[str] = None
     description: Optional[str] = None
-    start_date: Optional[datetime] = None
-    end_date: Optional[datetime] = None
+    start_date: Optional[UTCDateTime] = None
+    end_date: Optional[UTCDateTime] = None
     is_active: Optional[bool] = None
     category_id: Optional[int] = None
 
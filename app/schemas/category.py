@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 
 class CategoryBase(BaseModel):
     name: str
@@ -26,4 +26,18 @@ class CategoryInDB(CategoryBase):
 
 class Category(CategoryInDB):
     """Category representation for API responses"""
-    pass
\ No newline at end of file
+    pass
+
+class CategoryWithStats(Category):
+    """Category with its usage aggregated over all of its expenses"""
+    expense_count: int
+    total_spent: float
+    last_used: Optional[date] = None  # Day of the most recent expense
+
+class CategoryMerge(BaseModel):
+    target_category_id: int
+
+class CategoryMergeResult(BaseModel):
+    category: Category  # The category everything was merged into
+    expenses_moved: int
+    budgets_moved: int
\ No newline at end of file
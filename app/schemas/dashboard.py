@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import List
+
+from app.schemas.budget import BudgetProgress
+from app.schemas.expense import ExpenseSummary, CategoryExpenseSummary, TimePeriodExpenseSummary
+
+class Dashboard(BaseModel):
+    """Everything the dashboard shows, for the last N calendar months"""
+    summary: ExpenseSummary
+    by_category: List[CategoryExpenseSummary]
+    monthly: List[TimePeriodExpenseSummary]
+    budgets: List[BudgetProgress]
@@ -1,11 +1,13 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
+from app.utils.periods import UTCDateTime
+
 class ExpenseBase(BaseModel):
     amount: float = Field(..., gt=0)
     description: Optional[str] = None
-    date: datetime
+    date: UTCDateTime
     note: Optional[str] = None
     payment_method: Optional[str] = None
     category_id: int
@@ -16,7 +18,7 @@ class ExpenseCreate(ExpenseBase):
 class ExpenseUpdate(BaseModel):
     amount: Optional[float] = Field(None, gt=0)
     description: Optional[str] = None
-    date: Optional[datetime] = None
+    date: Optional[UTCDateTime] = None
     note: Optional[str] = None
     payment_method: Optional[str] = None
     category_id: Optional[int] = None
@@ -34,6 +36,35 @@ class Expense(ExpenseInDB):
     """Expense representation for API responses"""
     pass
 
+class ExpenseSearchResult(Expense):
+    rank: float  # Relevance to the search query, higher is better
+
+class ExpenseBulkError(BaseModel):
+    row: int  # 1-based position of the record in the submitted data
+    errors: List[str]
+
+class ExpenseBulkResult(BaseModel):
+    inserted: int
+    errors: List[ExpenseBulkError] = []
+
+class ExpenseSelection(BaseModel):
+    """Selects expenses by id, by filter, or both (all given criteria must match)"""
+    ids: Optional[List[int]] = None
+    category_id: Optional[int] = None
+    start_date: Optional[UTCDateTime] = None
+    end_date: Optional[UTCDateTime] = None
+
+class ExpenseBulkUpdate(ExpenseSelection):
+    changes: ExpenseUpdate
+
+class ExpenseBulkUpdateResult(BaseModel):
+    updated: int
+    ids: List[int]
+
+class ExpenseBulkDeleteResult(BaseModel):
+    deleted: int
+    ids: List[int]
+
 # For expense analytics and reporting
 class ExpenseSummary(BaseModel):
     total: float
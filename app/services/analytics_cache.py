@@ -0,0 +1,42 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+from app.core.cache import CacheBackend, TTLCache
+from app.services.user import get_data_version
+
+class AnalyticsCache:
+    """Per-user analytics response cache keyed by the user's data version
+
+    Every write to expenses, budgets or categories bumps the version, so an
+    entry is never served after the data it was computed from has changed.
+    The store is pluggable through the backend attribute.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    async def get_or_compute(self, db: AsyncSession, user_id: int, endpoint: str,
+                             params: Dict[str, Any], compute: Callable[[], Awaitable[Any]],
+                             version: Optional[int] = None):
+        """Return the cached result for these parameters or compute and store it
+
+        Pass the data version if the caller already read it in this request.
+        """
+        if version is None:
+            version = await db.run_sync(get_data_version, user_id)
+        key = (user_id, version, endpoint, tuple(sorted(params.items())))
+        
+        result = self.backend.get(key)
+        if result is None:
+            result = await compute()
+            self.backend.set(key, result)
+        
+        return result
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+analytics_cache = AnalyticsCache(
+    TTLCache(maxsize=settings.ANALYTICS_CACHE_SIZE, ttl=settings.ANALYTICS_CACHE_TTL)
+)
@@ -1,17 +1,32 @@
 from datetime import timedelta
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.models.user import User
-from app.utils.security import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.utils.security import password_hasher, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 
-def authenticate_user(db: Session, email: str, password: str):
-    """Authenticate a user by email and password"""
-    user = db.query(User).filter(User.email == email).first()
+def _get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+def _store_password_hash(db: Session, user: User, hashed_password: str):
+    user.hashed_password = hashed_password
+    db.commit()
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    """Authenticate a user by email and password
+
+    The password is checked in the password hashing process pool; hashes
+    made with an outdated bcrypt cost are replaced on successful login.
+    """
+    user = await db.run_sync(_get_user_by_email, email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
         return False
+    if new_hash:
+        await db.run_sync(_store_password_hash, user, new_hash)
     return user
 
 def create_user_token(user: User):
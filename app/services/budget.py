@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, tuple_, and_, or_
 from fastapi import HTTPException, status
 from datetime import datetime
 from typing import List, Optional
@@ -8,20 +8,27 @@ from app.models.budget import Budget
 from app.models.category import Category
 from app.models.expense import Expense
 from app.schemas.budget import BudgetCreate, BudgetUpdate, BudgetProgress
+from app.services.user import bump_data_version
+from app.utils.pagination import decode_cursor
 
 def get_budgets(db: Session, user_id: int, skip: int = 0, limit: int = 100, 
-               active_only: bool = False):
-    """Get budgets for a user"""
+               active_only: bool = False, cursor: Optional[str] = None):
+    """Get budgets for a user, paginated by offset or by (start_date, id) cursor"""
     query = db.query(Budget).filter(Budget.user_id == user_id)
     
     # Filter for active budgets if requested
     if active_only:
         query = query.filter(Budget.is_active == True)
     
-    # Order by start date descending (newest first)
-    query = query.order_by(Budget.start_date.desc())
+    # Order by start date descending (newest first), id breaks ties for stable cursors
+    query = query.order_by(Budget.start_date.desc(), Budget.id.desc())
+    
+    # Apply pagination: seek past the cursor if given, otherwise offset
+    if cursor:
+        cursor_start_date, cursor_id = decode_cursor(cursor, (datetime, int))
+        query = query.filter(tuple_(Budget.start_date, Budget.id) < tuple_(cursor_start_date, cursor_id))
+        return query.limit(limit).all()
     
-    # Apply pagination
     return query.offset(skip).limit(limit).all()
 
 def get_budget(db: Session, budget_id: int, user_id: int):
@@ -68,6 +75,7 @@ def create_budget(db: Session, budget_data: BudgetCreate, user_id: int):
     )
     
     db.add(db_budget)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(db_budget)
     
@@ -105,6 +113,7 @@ def update_budget(db: Session, budget_id: int, budget_data: BudgetUpdate, user_i
     for key, value in update_data.items():
         setattr(db_budget, key, value)
     
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(db_budget)
     
@@ -117,38 +126,43 @@ def delete_budget(db: Session, budget_id: int, user_id: int):
     
     # Delete budget
     db.delete(db_budget)
+    bump_data_version(db, user_id)
     db.commit()
     
     return {"message": "Budget deleted successfully"}
 
-def get_budget_progress(db: Session, budget_id: int, user_id: int):
-    """Get progress information for a specific budget"""
-    # Get budget
-    budget = get_budget(db, budget_id, user_id)
-    
-    # Calculate total spending for this budget's period and category (if applicable)
-    query = db.query(func.sum(Expense.amount)).filter(
-        Expense.user_id == user_id,
-        Expense.date >= budget.start_date,
-        Expense.date <= budget.end_date
-    )
-    
-    # Filter by category if the budget is category-specific
-    if budget.category_id:
-        query = query.filter(Expense.category_id == budget.category_id)
-    
-    spent_amount = query.scalar() or 0
+def _budget_progress_query(db: Session, user_id: int):
+    """Build a query yielding (budget, category_name, spent_amount) rows for a user
+
+    Expenses are joined on the budget's user, date window and, for
+    category-specific budgets, its category, so every budget's spending is
+    aggregated in the same statement.
+    """
+    spent_amount = func.coalesce(func.sum(Expense.amount), 0).label("spent_amount")
+    
+    return db.query(
+        Budget,
+        Category.name.label("category_name"),
+        spent_amount
+    ).outerjoin(
+        Category, Category.id == Budget.category_id
+    ).outerjoin(
+        Expense, and_(
+            Expense.user_id == Budget.user_id,
+            Expense.date >= Budget.start_date,
+            Expense.date <= Budget.end_date,
+            or_(Budget.category_id.is_(None), Expense.category_id == Budget.category_id)
+        )
+    ).filter(
+        Budget.user_id == user_id
+    ).group_by(Budget.id, Category.id)
+
+def _build_budget_progress(budget: Budget, category_name: Optional[str], spent_amount: float):
+    """Build a BudgetProgress from a budget and the amount spent against it"""
     remaining_amount = budget.amount - spent_amount
     percentage_used = (spent_amount / budget.amount) * 100 if budget.amount > 0 else 0
     is_exceeded = spent_amount > budget.amount
     
-    # Get category name if applicable
-    category_name = None
-    if budget.category_id:
-        category = db.query(Category).filter(Category.id == budget.category_id).first()
-        if category:
-            category_name = category.name
-    
     return BudgetProgress(
         budget_id=budget.id,
         budget_name=budget.name,
@@ -163,14 +177,31 @@ def get_budget_progress(db: Session, budget_id: int, user_id: int):
         is_exceeded=is_exceeded
     )
 
-def get_all_budget_progress(db: Session, user_id: int, active_only: bool = True):
-    """Get progress information for all budgets"""
-    # Get budgets
-    budgets = get_budgets(db, user_id, active_only=active_only)
+def get_budget_progress(db: Session, budget_id: int, user_id: int):
+    """Get progress information for a specific budget"""
+    result = _budget_progress_query(db, user_id).filter(Budget.id == budget_id).first()
+    
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Budget not found"
+        )
+    
+    return _build_budget_progress(result.Budget, result.category_name, result.spent_amount)
+
+def get_all_budget_progress(db: Session, user_id: int, active_only: bool = True,
+                            limit: int = 100):
+    """Get progress information for all budgets in a single query"""
+    query = _budget_progress_query(db, user_id)
+    
+    # Filter for active budgets if requested
+    if active_only:
+        query = query.filter(Budget.is_active == True)
     
-    result = []
-    for budget in budgets:
-        progress = get_budget_progress(db, budget.id, user_id)
-        result.append(progress)
+    # Same ordering and page size as get_budgets
+    query = query.order_by(Budget.start_date.desc(), Budget.id.desc()).limit(limit)
     
-    return result
\ No newline at end of file
+    return [
+        _build_budget_progress(result.Budget, result.category_name, result.spent_amount)
+        for result in query.all()
+    ]
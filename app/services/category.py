@@ -1,12 +1,88 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select, tuple_
 from fastapi import HTTPException, status
+from typing import Optional
 
+from app.models.budget import Budget
 from app.models.category import Category
-from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.models.expense import Expense
+from app.models.expense_rollup import ExpenseDailyRollup
+from app.schemas.category import (
+    CategoryCreate, CategoryUpdate, CategoryInDB, CategoryWithStats, CategoryMergeResult
+)
+from app.services.rollup import rebuild_daily_rollups
+from app.services.user import bump_data_version
+from app.utils.pagination import decode_cursor
 
-def get_categories(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    """Get all categories for a user"""
-    return db.query(Category).filter(Category.user_id == user_id).offset(skip).limit(limit).all()
+# Category list orderings: key expression name and cursor value type, None meaning by id
+CATEGORY_SORTS = {"id": None, "usage": ("expense_count", int), "total": ("total_spent", float)}
+
+def get_categories(db: Session, user_id: int, skip: int = 0, limit: int = 100,
+                   cursor: Optional[str] = None, include_stats: bool = False, sort: str = "id"):
+    """Get all categories for a user, paginated by offset or by cursor
+
+    With include_stats every category comes with its expense count, total
+    and last-used day from the daily rollup, LEFT JOINed in the same query,
+    and can be sorted by usage or total (highest first) instead of id.
+    """
+    if include_stats:
+        return _get_categories_with_stats(db, user_id, skip, limit, cursor, sort)
+    
+    query = db.query(Category).filter(Category.user_id == user_id).order_by(Category.id)
+    
+    # Apply pagination: seek past the cursor if given, otherwise offset
+    if cursor:
+        (cursor_id,) = decode_cursor(cursor, (int,))
+        return query.filter(Category.id > cursor_id).limit(limit).all()
+    
+    return query.offset(skip).limit(limit).all()
+
+def _get_categories_with_stats(db: Session, user_id: int, skip: int, limit: int,
+                               cursor: Optional[str], sort: str):
+    """List categories with usage aggregates for get_categories"""
+    stats = select(
+        ExpenseDailyRollup.category_id,
+        func.sum(ExpenseDailyRollup.count).label("expense_count"),
+        func.sum(ExpenseDailyRollup.total).label("total_spent"),
+        func.max(ExpenseDailyRollup.day).label("last_used")
+    ).where(
+        ExpenseDailyRollup.user_id == user_id
+    ).group_by(ExpenseDailyRollup.category_id).subquery()
+    
+    columns = {
+        "expense_count": func.coalesce(stats.c.expense_count, 0),
+        "total_spent": func.coalesce(stats.c.total_spent, 0.0),
+    }
+    # LEFT JOIN so unused categories are listed with zero stats
+    query = db.query(
+        Category, columns["expense_count"], columns["total_spent"], stats.c.last_used
+    ).outerjoin(
+        stats, stats.c.category_id == Category.id
+    ).filter(Category.user_id == user_id)
+    
+    if CATEGORY_SORTS[sort] is None:
+        query = query.order_by(Category.id)
+        if cursor:
+            (cursor_id,) = decode_cursor(cursor, (int,))
+            query = query.filter(Category.id > cursor_id)
+    else:
+        name, value_type = CATEGORY_SORTS[sort]
+        query = query.order_by(columns[name].desc(), Category.id.desc())
+        if cursor:
+            cursor_value, cursor_id = decode_cursor(cursor, (value_type, int))
+            query = query.filter(tuple_(columns[name], Category.id) < tuple_(cursor_value, cursor_id))
+    
+    if not cursor:
+        query = query.offset(skip)
+    
+    return [
+        CategoryWithStats(
+            **CategoryInDB.from_orm(category).dict(),
+            expense_count=expense_count,
+            total_spent=total_spent,
+            last_used=last_used
+        ) for category, expense_count, total_spent, last_used in query.limit(limit).all()
+    ]
 
 def get_category(db: Session, category_id: int, user_id: int):
     """Get a specific category by ID"""
@@ -44,6 +120,7 @@ def create_category(db: Session, category_data: CategoryCreate, user_id: int):
     )
     
     db.add(db_category)
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(db_category)
     
@@ -73,6 +150,7 @@ def update_category(db: Session, category_id: int, category_data: CategoryUpdate
     for key, value in update_data.items():
         setattr(db_category, key, value)
     
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(db_category)
     
@@ -83,8 +161,12 @@ def delete_category(db: Session, category_id: int, user_id: int):
     # Get existing category
     db_category = get_category(db, category_id, user_id)
     
-    # Check if the category has any expenses
-    if db_category.expenses:
+    # Check if the category has any expenses without loading them
+    has_expenses = db.query(
+        db.query(Expense.id).filter(Expense.category_id == category_id).exists()
+    ).scalar()
+    
+    if has_expenses:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete category that has expenses"
@@ -92,6 +174,56 @@ def delete_category(db: Session, category_id: int, user_id: int):
     
     # Delete category
     db.delete(db_category)
+    bump_data_version(db, user_id)
+    db.commit()
+    
+    return {"message": "Category deleted successfully"}
+
+def merge_category(db: Session, category_id: int, target_category_id: int, user_id: int):
+    """Move all expenses and budgets of a category into another one, then delete it"""
+    if category_id == target_category_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot merge a category into itself"
+        )
+    
+    get_category(db, category_id, user_id)
+    target = get_category(db, target_category_id, user_id)
+    
+    # Days the source category has rollup rows for, before they are rebuilt away
+    first_day, last_day = db.query(
+        func.min(ExpenseDailyRollup.day),
+        func.max(ExpenseDailyRollup.day)
+    ).filter(
+        ExpenseDailyRollup.user_id == user_id,
+        ExpenseDailyRollup.category_id == category_id
+    ).one()
+    
+    # Reassign everything with one UPDATE per table
+    expenses_moved = db.query(Expense).filter(
+        Expense.user_id == user_id,
+        Expense.category_id == category_id
+    ).update({Expense.category_id: target_category_id}, synchronize_session=False)
+    
+    budgets_moved = db.query(Budget).filter(
+        Budget.user_id == user_id,
+        Budget.category_id == category_id
+    ).update({Budget.category_id: target_category_id}, synchronize_session=False)
+    
+    # Fold the source's rollup rows into the target's for the affected days
+    if first_day is not None:
+        rebuild_daily_rollups(
+            db, user_id, first_day, last_day,
+            category_ids=[category_id, target_category_id],
+            commit=False
+        )
+    
+    db.query(Category).filter(Category.id == category_id).delete(synchronize_session=False)
+    bump_data_version(db, user_id)
     db.commit()
     
-    return {"message": "Category deleted successfully"}
\ No newline at end of file
+    return CategoryMergeResult(
+        category=target,
+        expenses_moved=expenses_moved,
+        budgets_moved=budgets_moved
+    )
\ No newline at end of file
@@ -0,0 +1,80 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, extract, tuple_
+from datetime import datetime
+
+from app.models.expense import Expense
+from app.models.category import Category
+from app.schemas.dashboard import Dashboard
+from app.services.budget import get_all_budget_progress
+from app.services.expense import summarize, summarize_categories, summarize_months
+from app.services.rollup import merge_aggregates
+from app.utils import periods
+
+def get_dashboard(db: Session, user_id: int, months: int = 12):
+    """Get summary, per-category and per-month expenses plus budget progress
+
+    The three expense aggregates come from one scan of the date range: a
+    GROUPING SETS query on PostgreSQL, elsewhere a single category x month
+    grouping rolled up in Python.
+    """
+    end_date = datetime.now()
+    start_date = periods.shift(periods.truncate(end_date, "month"), "month", 1 - months)
+    
+    year = extract('year', Expense.date)
+    month = extract('month', Expense.date)
+    aggregates = [
+        func.sum(Expense.amount),
+        func.count(Expense.id),
+        func.min(Expense.amount),
+        func.max(Expense.amount)
+    ]
+    
+    overall = {}
+    categories = {}
+    category_names = {}
+    monthly = {}
+    
+    if db.get_bind().dialect.name == "postgresql":
+        query = db.query(
+            Category.id, Category.name, year, month,
+            func.grouping(Category.id), func.grouping(year),
+            *aggregates
+        ).join(Category, Category.id == Expense.category_id).filter(
+            Expense.user_id == user_id,
+            Expense.date >= start_date,
+            Expense.date <= end_date
+        ).group_by(func.grouping_sets(
+            tuple_(),
+            tuple_(Category.id, Category.name),
+            tuple_(year, month)
+        ))
+        for category_id, category_name, row_year, row_month, category_grouped, month_grouped, *values in query.all():
+            if not values[1]:
+                continue
+            if category_grouped and month_grouped:
+                merge_aggregates(overall, (), *values)
+            elif month_grouped:
+                category_names[category_id] = category_name
+                merge_aggregates(categories, (category_id,), *values)
+            else:
+                merge_aggregates(monthly, (int(row_year), int(row_month)), *values)
+    else:
+        query = db.query(
+            Category.id, Category.name, year, month, *aggregates
+        ).join(Category, Category.id == Expense.category_id).filter(
+            Expense.user_id == user_id,
+            Expense.date >= start_date,
+            Expense.date <= end_date
+        ).group_by(Category.id, Category.name, year, month)
+        for category_id, category_name, row_year, row_month, *values in query.all():
+            category_names[category_id] = category_name
+            merge_aggregates(overall, (), *values)
+            merge_aggregates(categories, (category_id,), *values)
+            merge_aggregates(monthly, (int(row_year), int(row_month)), *values)
+    
+    return Dashboard(
+        summary=summarize(overall.get(())),
+        by_category=summarize_categories(categories, category_names),
+        monthly=summarize_months(monthly, start_date, months),
+        budgets=get_all_budget_progress(db, user_id)
+    )
@@ -1,18 +1,37 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from sqlalchemy import (
+    DateTime, Float, and_, cast, delete, exists, func, insert, literal, literal_column, or_, select, tuple_, update
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.util import await_only
 from fastapi import HTTPException, status
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from pydantic import ValidationError
+from datetime import datetime
+from typing import Any, List, Dict, Optional
+import io
 
-from app.models.expense import Expense
+from app.config import settings
+from app.core.cache import TTLCache
+from app.models.expense import Expense, SEARCH_CONFIG, SEARCH_TEXT
 from app.models.category import Category
-from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseSummary, CategoryExpenseSummary, TimePeriodExpenseSummary
+from app.schemas.expense import (
+    ExpenseCreate, ExpenseUpdate, ExpenseInDB, ExpenseSearchResult,
+    ExpenseSummary, CategoryExpenseSummary, TimePeriodExpenseSummary,
+    ExpenseBulkError, ExpenseBulkResult, ExpenseSelection, ExpenseBulkUpdate,
+    ExpenseBulkUpdateResult, ExpenseBulkDeleteResult
+)
+from app.services.rollup import (
+    add_to_daily_rollup, refresh_daily_rollup, rebuild_daily_rollups, aggregate_expenses
+)
+from app.services.user import bump_data_version, get_data_version
+from app.utils import periods, text_search
+from app.utils.csv_io import CsvRowError
+from app.utils.pagination import decode_cursor
 
-def get_expenses(db: Session, user_id: int, skip: int = 0, limit: int = 100, 
-                category_id: Optional[int] = None, start_date: Optional[datetime] = None, 
-                end_date: Optional[datetime] = None):
-    """Get expenses for a user with optional filters"""
-    query = db.query(Expense).filter(Expense.user_id == user_id)
+def _filter_expenses(query, user_id: int, category_id: Optional[int] = None,
+                     start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
+    """Apply the get_expenses filters and newest-first ordering to a Query or select()"""
+    query = query.filter(Expense.user_id == user_id)
     
     # Apply filters if provided
     if category_id:
@@ -24,12 +43,133 @@ def get_expenses(db: Session, user_id: int, skip: int = 0, limit: int = 100,
     if end_date:
         query = query.filter(Expense.date <= end_date)
     
-    # Order by date descending (newest first)
-    query = query.order_by(Expense.date.desc())
+    # Order by date descending (newest first), id breaks ties for stable cursors
+    return query.order_by(Expense.date.desc(), Expense.id.desc())
+
+def get_expenses(db: Session, user_id: int, skip: int = 0, limit: int = 100, 
+                category_id: Optional[int] = None, start_date: Optional[datetime] = None, 
+                end_date: Optional[datetime] = None, cursor: Optional[str] = None):
+    """Get expenses for a user with optional filters
+
+    When a cursor is given, the page starts right after the (date, id) it
+    encodes instead of skipping rows with OFFSET.
+    """
+    query = _filter_expenses(db.query(Expense), user_id, category_id, start_date, end_date)
+    
+    # Apply pagination: seek past the cursor if given, otherwise offset
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor, (datetime, int))
+        query = query.filter(tuple_(Expense.date, Expense.id) < tuple_(cursor_date, cursor_id))
+        return query.limit(limit).all()
     
-    # Apply pagination
     return query.offset(skip).limit(limit).all()
 
+def search_expenses(db: Session, user_id: int, q: str, limit: int = 50,
+                    category_id: Optional[int] = None, start_date: Optional[datetime] = None,
+                    end_date: Optional[datetime] = None, cursor: Optional[str] = None):
+    """Search a user's expenses by description and note, best matches first
+
+    PostgreSQL matches the indexed tsvector column, the trigram index for
+    substrings and fuzzy matches, and ranks by both. Other databases rank in
+    Python. Pages continue after the (rank, id) a cursor encodes.
+    """
+    after = decode_cursor(cursor, (float, int)) if cursor else None
+    
+    if db.get_bind().dialect.name != "postgresql":
+        return _search_expenses_fallback(db, user_id, q, limit, category_id, start_date, end_date, after)
+    
+    return [
+        ExpenseSearchResult(**ExpenseInDB.from_orm(expense).dict(), rank=expense_rank)
+        for expense, expense_rank in _search_query(
+            db, user_id, q, category_id, start_date, end_date, after
+        ).limit(limit).all()
+    ]
+
+def _search_query(db: Session, user_id: int, q: str, category_id: Optional[int],
+                  start_date: Optional[datetime], end_date: Optional[datetime], after: Optional[list]):
+    """Build the PostgreSQL search query selecting (Expense, rank), best matches first"""
+    text = literal_column(f"({SEARCH_TEXT})")
+    vector = literal_column("expenses.search_vector", type_=TSVECTOR)
+    tsquery = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), q)
+    pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    # ts_rank and word_similarity are real; as double precision the rank
+    # returned to clients compares equal to itself when sent back in a cursor
+    rank = cast(func.ts_rank(vector, tsquery) + func.word_similarity(q, text), Float(53)).label("rank")
+    
+    query = _filter_expenses(
+        db.query(Expense, rank), user_id, category_id, start_date, end_date
+    ).filter(or_(
+        vector.op("@@")(tsquery),
+        text.ilike(pattern, escape="\\"),
+        literal(q).op("<%")(text)
+    )).order_by(None).order_by(rank.desc(), Expense.id.desc())
+    
+    if after:
+        query = query.filter(tuple_(rank, Expense.id) < tuple_(*after))
+    
+    return query
+
+# Per-user (InvertedIndex, {expense id: (category_id, date, text)}) keyed by (user_id, data version)
+search_index_cache = TTLCache(maxsize=settings.SEARCH_INDEX_CACHE_SIZE, ttl=settings.SEARCH_INDEX_CACHE_TTL)
+
+def _search_index(db: Session, user_id: int):
+    """Get the user's search index, building it when their data version has changed"""
+    key = (user_id, get_data_version(db, user_id))
+    entry = search_index_cache.get(key)
+    if entry is None:
+        documents = {
+            expense_id: (category_id, date, f"{description or ''} {note or ''}")
+            for expense_id, category_id, date, description, note in db.query(
+                Expense.id, Expense.category_id, Expense.date, Expense.description, Expense.note
+            ).filter(Expense.user_id == user_id)
+        }
+        index = text_search.InvertedIndex((expense_id, text) for expense_id, (_, _, text) in documents.items())
+        entry = (index, documents)
+        search_index_cache.set(key, entry)
+    return entry
+
+def _search_expenses_fallback(db: Session, user_id: int, q: str, limit: int,
+                              category_id: Optional[int], start_date: Optional[datetime],
+                              end_date: Optional[datetime], after: Optional[list]):
+    """Rank expense text in Python for databases without full-text search
+
+    Candidates come from the user's cached inverted index, so only expenses
+    containing every query word are filtered and ranked.
+    """
+    index, documents = _search_index(db, user_id)
+    start_date, end_date = periods.naive_utc(start_date), periods.naive_utc(end_date)
+    
+    ranked = []
+    for expense_id in index.candidates(q):
+        expense_category_id, date, text = documents[expense_id]
+        if ((category_id and expense_category_id != category_id)
+                or (start_date and date < start_date) or (end_date and date > end_date)):
+            continue
+        expense_rank = text_search.rank(q, text)
+        if expense_rank and (not after or (expense_rank, expense_id) < tuple(after)):
+            ranked.append((expense_rank, expense_id))
+    page = sorted(ranked, reverse=True)[:limit]
+    
+    expenses = {expense.id: expense for expense in db.query(Expense).filter(Expense.id.in_([i for _, i in page]))}
+    return [
+        ExpenseSearchResult(**ExpenseInDB.from_orm(expenses[expense_id]).dict(), rank=expense_rank)
+        for expense_rank, expense_id in page
+    ]
+
+# Columns included in exports, in output order
+EXPORT_COLUMNS = ["id", "date", "amount", "category_id", "description", "note", "payment_method",
+                  "created_at", "updated_at"]
+
+def get_expense_export_query(user_id: int, category_id: Optional[int] = None,
+                             start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
+    """Build a column-only SELECT of a user's expenses for streaming exports
+
+    Uses the same filters and ordering as get_expenses; plain rows instead
+    of ORM objects keep per-row overhead low.
+    """
+    statement = select(*[getattr(Expense, column) for column in EXPORT_COLUMNS])
+    return _filter_expenses(statement, user_id, category_id, start_date, end_date)
+
 def get_expense(db: Session, expense_id: int, user_id: int):
     """Get a specific expense by ID"""
     expense = db.query(Expense).filter(
@@ -46,176 +186,526 @@ def get_expense(db: Session, expense_id: int, user_id: int):
     return expense
 
 def create_expense(db: Session, expense_data: ExpenseCreate, user_id: int):
-    """Create a new expense"""
-    # Verify the category exists and belongs to the user
-    category = db.query(Category).filter(
+    """Create a new expense
+
+    The INSERT selects from the user's own category, so a foreign or missing
+    category inserts nothing; RETURNING loads the new row without a refresh.
+    """
+    values = expense_data.dict()
+    columns = [column for column in values if column != "category_id"]
+    source = select(
+        *[literal(values[column], Expense.__table__.c[column].type) for column in columns],
+        literal(user_id, Expense.user_id.type),
+        Category.id
+    ).where(
         Category.id == expense_data.category_id,
         Category.user_id == user_id
+    )
+    
+    db_expense = db.scalars(
+        insert(Expense)
+        .from_select(columns + ["user_id", "category_id"], source)
+        .returning(Expense)
     ).first()
     
-    if not category:
+    if not db_expense:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
         )
     
-    # Create expense
-    db_expense = Expense(
-        **expense_data.dict(),
-        user_id=user_id
-    )
+    # Keep the daily rollup in the same transaction
+    add_to_daily_rollup(db, user_id, db_expense.category_id, db_expense.date.date(), db_expense.amount)
     
-    db.add(db_expense)
+    bump_data_version(db, user_id)
     db.commit()
-    db.refresh(db_expense)
     
     return db_expense
 
+# Columns an update may not set to null
+REQUIRED_FIELDS = ("amount", "date", "category_id")
+
+def _update_values(expense_data: ExpenseUpdate) -> Dict[str, Any]:
+    """The fields set in an update, rejecting explicit nulls for required columns"""
+    values = expense_data.dict(exclude_unset=True)
+    null_fields = [field for field in REQUIRED_FIELDS if field in values and values[field] is None]
+    if null_fields:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{', '.join(null_fields)} cannot be null"
+        )
+    return values
+
+# Fields whose change moves an expense within the daily rollup
+ROLLUP_FIELDS = {"amount", "date", "category_id"}
+
 def update_expense(db: Session, expense_id: int, expense_data: ExpenseUpdate, user_id: int):
-    """Update an existing expense"""
-    # Get existing expense
-    db_expense = get_expense(db, expense_id, user_id)
-    
-    # Check if category_id is being updated and is valid
-    if expense_data.category_id and expense_data.category_id != db_expense.category_id:
-        category = db.query(Category).filter(
-            Category.id == expense_data.category_id,
-            Category.user_id == user_id
+    """Update an existing expense
+
+    A new category's ownership is checked inside the UPDATE and RETURNING
+    loads the result. The current rollup bucket is read first only when
+    the change affects the rollup.
+    """
+    update_data = _update_values(expense_data)
+    if not update_data:
+        return get_expense(db, expense_id, user_id)
+    
+    # Remember the rollup bucket the expense is leaving
+    old_bucket = None
+    if ROLLUP_FIELDS & update_data.keys():
+        current = db.query(Expense.category_id, Expense.date).filter(
+            Expense.id == expense_id,
+            Expense.user_id == user_id
         ).first()
         
-        if not category:
+        if not current:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found"
+                detail="Expense not found"
             )
+        old_bucket = (current.category_id, current.date.date())
     
-    # Update fields
-    update_data = expense_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_expense, key, value)
+    statement = update(Expense).where(
+        Expense.id == expense_id,
+        Expense.user_id == user_id
+    )
+    
+    # Only move the expense into a category the user owns
+    if "category_id" in update_data:
+        statement = statement.where(exists().where(
+            Category.id == update_data["category_id"],
+            Category.user_id == user_id
+        ))
+    
+    db_expense = db.scalars(statement.values(**update_data).returning(Expense)).first()
+    
+    if not db_expense:
+        # Nothing matched: either the expense or the new category is missing
+        if old_bucket is None:
+            get_expense(db, expense_id, user_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found"
+        )
+    
+    # Refresh the old bucket; a different new bucket only gains the expense
+    if old_bucket is not None:
+        new_bucket = (db_expense.category_id, db_expense.date.date())
+        refresh_daily_rollup(db, user_id, *old_bucket)
+        if new_bucket != old_bucket:
+            add_to_daily_rollup(db, user_id, *new_bucket, db_expense.amount)
     
+    bump_data_version(db, user_id)
     db.commit()
-    db.refresh(db_expense)
     
     return db_expense
 
 def delete_expense(db: Session, expense_id: int, user_id: int):
     """Delete an expense"""
-    # Get existing expense
-    db_expense = get_expense(db, expense_id, user_id)
+    deleted = db.execute(
+        delete(Expense).where(
+            Expense.id == expense_id,
+            Expense.user_id == user_id
+        ).returning(Expense.category_id, Expense.date)
+    ).first()
+    
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Expense not found"
+        )
     
-    # Delete expense
-    db.delete(db_expense)
+    # Refresh the bucket it belonged to
+    refresh_daily_rollup(db, user_id, deleted.category_id, deleted.date.date())
+    bump_data_version(db, user_id)
     db.commit()
     
     return {"message": "Expense deleted successfully"}
 
-def get_expense_summary(db: Session, user_id: int, start_date: Optional[datetime] = None, 
-                       end_date: Optional[datetime] = None):
-    """Get expense summary statistics"""
-    query = db.query(
-        func.sum(Expense.amount).label("total"),
-        func.count(Expense.id).label("count"),
-        func.avg(Expense.amount).label("average"),
-        func.min(Expense.amount).label("min"),
-        func.max(Expense.amount).label("max")
-    ).filter(Expense.user_id == user_id)
-    
-    # Apply date filters if provided
-    if start_date:
-        query = query.filter(Expense.date >= start_date)
+# Columns written by bulk inserts, in COPY order
+BULK_COLUMNS = ["amount", "description", "date", "note", "payment_method", "user_id", "category_id"]
+BULK_BATCH_SIZE = 5000
+
+def _copy_text_value(value: Any) -> str:
+    """Format a value for PostgreSQL COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return (
+        str(value).replace("\\", "\\\\").replace("\t", "\\t")
+        .replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+def bulk_insert_expenses(db: Session, rows: List[Dict[str, Any]]):
+    """Insert expense rows in batches on the session's connection
+
+    Uses COPY on PostgreSQL (psycopg2 or asyncpg) and an executemany INSERT
+    on other databases. Runs inside the session's transaction. Rows are not
+    validated and rollups are left to the caller.
+    """
+    connection = db.connection()
+    driver = connection.dialect.driver
+    
+    for start in range(0, len(rows), BULK_BATCH_SIZE):
+        batch = rows[start:start + BULK_BATCH_SIZE]
+        
+        if driver == "psycopg2":
+            buffer = io.StringIO()
+            for row in batch:
+                buffer.write("\t".join(_copy_text_value(row[column]) for column in BULK_COLUMNS))
+                buffer.write("\n")
+            buffer.seek(0)
+            with connection.connection.cursor() as cursor:
+                cursor.copy_expert(f"COPY expenses ({', '.join(BULK_COLUMNS)}) FROM STDIN", buffer)
+        elif driver == "asyncpg":
+            # Called through AsyncSession.run_sync, so the coroutine can be awaited in place
+            await_only(connection.connection.driver_connection.copy_records_to_table(
+                "expenses",
+                records=[tuple(row[column] for column in BULK_COLUMNS) for row in batch],
+                columns=BULK_COLUMNS
+            ))
+        else:
+            db.execute(insert(Expense), batch)
+
+def bulk_create_expenses(db: Session, records: List[Dict[str, Any]], user_id: int):
+    """Validate and insert many expenses in one transaction
+
+    Every record is validated and all referenced categories are checked in
+    a single query. Valid records are inserted; invalid ones are reported
+    by their 1-based position in the input.
+    """
+    errors = []
+    valid = []
+    
+    for row_number, record in enumerate(records, start=1):
+        if isinstance(record, CsvRowError):
+            errors.append(ExpenseBulkError(row=row_number, errors=[record.message]))
+            continue
+        try:
+            valid.append((row_number, ExpenseCreate(**record)))
+        except ValidationError as e:
+            errors.append(ExpenseBulkError(
+                row=row_number,
+                errors=[f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in e.errors()]
+            ))
+        except TypeError:
+            errors.append(ExpenseBulkError(row=row_number, errors=["Row must be an object"]))
+    
+    # Verify all referenced categories exist and belong to the user at once
+    category_ids = {expense.category_id for _, expense in valid}
+    owned_category_ids = {
+        category_id for (category_id,) in db.query(Category.id).filter(
+            Category.user_id == user_id,
+            Category.id.in_(category_ids)
+        )
+    } if category_ids else set()
     
-    if end_date:
-        query = query.filter(Expense.date <= end_date)
+    rows = []
+    for row_number, expense in valid:
+        if expense.category_id not in owned_category_ids:
+            errors.append(ExpenseBulkError(row=row_number, errors=["category_id: Category not found"]))
+            continue
+        rows.append({**expense.dict(), "user_id": user_id})
+    
+    if rows:
+        bulk_insert_expenses(db, rows)
+        
+        # Rebuild the rollup buckets the new expenses fall into
+        days = [row["date"].date() for row in rows]
+        rebuild_daily_rollups(
+            db, user_id, min(days), max(days),
+            category_ids={row["category_id"] for row in rows},
+            commit=False
+        )
+        bump_data_version(db, user_id)
+        db.commit()
     
-    result = query.first()
+    errors.sort(key=lambda error: error.row)
+    return ExpenseBulkResult(inserted=len(rows), errors=errors)
+
+def _select_expenses(statement, user_id: int, selection: ExpenseSelection):
+    """Restrict an UPDATE, DELETE or select() to the user's expenses matching a selection"""
+    if selection.ids is None and not (selection.category_id or selection.start_date or selection.end_date):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Select expenses by ids or by category_id, start_date or end_date"
+        )
+    
+    statement = statement.where(Expense.user_id == user_id)
+    
+    if selection.ids is not None:
+        statement = statement.where(Expense.id.in_(selection.ids))
+    
+    if selection.category_id:
+        statement = statement.where(Expense.category_id == selection.category_id)
+    
+    if selection.start_date:
+        statement = statement.where(Expense.date >= selection.start_date)
+    
+    if selection.end_date:
+        statement = statement.where(Expense.date <= selection.end_date)
+    
+    return statement
+
+def _rebuild_buckets(db: Session, user_id: int, buckets):
+    """Rebuild the rollups covering a set of (category_id, datetime) buckets"""
+    if not buckets:
+        return
+    days = [day.date() for _, day in buckets]
+    rebuild_daily_rollups(
+        db, user_id, min(days), max(days),
+        category_ids={category_id for category_id, _ in buckets},
+        commit=False
+    )
+
+def bulk_update_expenses(db: Session, data: ExpenseBulkUpdate, user_id: int):
+    """Apply the same changes to every selected expense in one UPDATE"""
+    changes = _update_values(data.changes)
+    if not changes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No changes given"
+        )
+    
+    # Verify the target category once for the whole batch
+    if "category_id" in changes:
+        category = db.query(Category.id).filter(
+            Category.id == changes["category_id"],
+            Category.user_id == user_id
+        ).first()
+        
+        if not category:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            )
     
-    if not result or result.count == 0:
+    # Moving expenses between categories or days also empties their old buckets
+    buckets = set()
+    if "category_id" in changes or "date" in changes:
+        buckets.update(db.execute(
+            _select_expenses(select(Expense.category_id, Expense.date), user_id, data)
+        ).all())
+    
+    result = db.execute(
+        _select_expenses(update(Expense), user_id, data)
+        .values(**changes)
+        .returning(Expense.id, Expense.category_id, Expense.date)
+        .execution_options(synchronize_session=False)
+    ).all()
+    
+    if result:
+        if buckets or "amount" in changes:
+            buckets.update((category_id, day) for _, category_id, day in result)
+            _rebuild_buckets(db, user_id, buckets)
+        bump_data_version(db, user_id)
+        db.commit()
+    
+    return ExpenseBulkUpdateResult(updated=len(result), ids=[expense_id for expense_id, _, _ in result])
+
+def bulk_delete_expenses(db: Session, selection: ExpenseSelection, user_id: int):
+    """Delete every selected expense in one DELETE"""
+    result = db.execute(
+        _select_expenses(delete(Expense), user_id, selection)
+        .returning(Expense.id, Expense.category_id, Expense.date)
+        .execution_options(synchronize_session=False)
+    ).all()
+    
+    if result:
+        _rebuild_buckets(db, user_id, {(category_id, day) for _, category_id, day in result})
+        bump_data_version(db, user_id)
+        db.commit()
+    
+    return ExpenseBulkDeleteResult(deleted=len(result), ids=[expense_id for expense_id, _, _ in result])
+
+def summarize(result: Optional[list]) -> ExpenseSummary:
+    """Build an ExpenseSummary from [total, count, min, max] aggregates, or None"""
+    if not result:
         return ExpenseSummary(total=0, count=0, average=0)
     
+    total, count, min_amount, max_amount = result
     return ExpenseSummary(
-        total=result.total,
-        count=result.count,
-        average=result.average,
-        min=result.min,
-        max=result.max
+        total=total,
+        count=count,
+        average=total / count,
+        min=min_amount,
+        max=max_amount
+    )
+
+def summarize_categories(results: Dict[tuple, list], category_names: Dict[int, str]) -> List[CategoryExpenseSummary]:
+    """Build per-category summaries from aggregates keyed by (category_id,), largest total first"""
+    summaries = [
+        CategoryExpenseSummary(
+            category_id=category_id,
+            category_name=category_names[category_id],
+            total=total,
+            count=count,
+            average=total / count,
+            min=min_amount,
+            max=max_amount
+        ) for (category_id,), (total, count, min_amount, max_amount) in results.items()
+    ]
+    
+    # Order by total amount descending
+    summaries.sort(key=lambda summary: summary.total, reverse=True)
+    
+    return summaries
+
+def _period_summary(period: str, result: Optional[list]) -> TimePeriodExpenseSummary:
+    if not result or not result[1]:
+        return TimePeriodExpenseSummary(period=period, total=0, count=0, average=0)
+    
+    total, count, min_amount, max_amount = result
+    return TimePeriodExpenseSummary(
+        period=period,
+        total=total,
+        count=count,
+        average=total / count,
+        min=min_amount,
+        max=max_amount
     )
 
+def summarize_months(results: Dict[tuple, list], start_date: datetime, months: int) -> List[TimePeriodExpenseSummary]:
+    """Build one summary per calendar month from start_date from aggregates keyed by (year, month)
+
+    Months without aggregates are included with zero totals.
+    """
+    summaries = []
+    for index in range(months):
+        month_start = periods.shift(start_date, "month", index)
+        summaries.append(_period_summary(
+            periods.label(month_start, "month"),  # Format: YYYY-MM
+            results.get((month_start.year, month_start.month))
+        ))
+    
+    return summaries
+
+def get_expense_summary(db: Session, user_id: int, start_date: Optional[datetime] = None, 
+                       end_date: Optional[datetime] = None):
+    """Get expense summary statistics"""
+    return summarize(aggregate_expenses(db, user_id, start_date, end_date).get(()))
+
 def get_expenses_by_category(db: Session, user_id: int, start_date: Optional[datetime] = None, 
                             end_date: Optional[datetime] = None):
     """Get expense summary grouped by category"""
-    query = db.query(
-        Category.id.label("category_id"),
-        Category.name.label("category_name"),
-        func.sum(Expense.amount).label("total"),
-        func.count(Expense.id).label("count"),
-        func.avg(Expense.amount).label("average"),
-        func.min(Expense.amount).label("min"),
-        func.max(Expense.amount).label("max")
-    ).join(Category).filter(Expense.user_id == user_id)
-    
-    # Apply date filters if provided
-    if start_date:
-        query = query.filter(Expense.date >= start_date)
-    
-    if end_date:
-        query = query.filter(Expense.date <= end_date)
-    
-    # Group by category
-    query = query.group_by(Category.id, Category.name)
+    results = aggregate_expenses(db, user_id, start_date, end_date, group_by="category")
     
-    # Order by total amount descending
-    query = query.order_by(func.sum(Expense.amount).desc())
+    if not results:
+        return []
     
-    results = query.all()
+    # Look up names for the categories that have expenses
+    category_names = dict(
+        db.query(Category.id, Category.name).filter(
+            Category.id.in_([category_id for (category_id,) in results])
+        ).all()
+    )
     
-    return [
-        CategoryExpenseSummary(
-            category_id=result.category_id,
-            category_name=result.category_name,
-            total=result.total,
-            count=result.count,
-            average=result.average,
-            min=result.min,
-            max=result.max
-        ) for result in results
-    ]
+    return summarize_categories(results, category_names)
 
 def get_monthly_expenses(db: Session, user_id: int, months: int = 12):
-    """Get monthly expense summaries for the last N months"""
-    # Calculate start date (first day of month N months ago)
+    """Get monthly expense summaries for the last N calendar months, including empty ones"""
+    # From the first day of the month N - 1 months before the current one until now
     end_date = datetime.now()
-    start_date = end_date - timedelta(days=30 * months)
-    
-    query = db.query(
-        extract('year', Expense.date).label('year'),
-        extract('month', Expense.date).label('month'),
-        func.sum(Expense.amount).label("total"),
-        func.count(Expense.id).label("count"),
-        func.avg(Expense.amount).label("average"),
-        func.min(Expense.amount).label("min"),
-        func.max(Expense.amount).label("max")
-    ).filter(
-        Expense.user_id == user_id,
-        Expense.date >= start_date,
-        Expense.date <= end_date
-    )
+    start_date = periods.shift(periods.truncate(end_date, "month"), "month", 1 - months)
     
-    # Group by year and month
-    query = query.group_by('year', 'month')
+    results = aggregate_expenses(db, user_id, start_date, end_date, group_by="month")
     
-    # Order by year and month descending (newest first)
-    query = query.order_by('year', 'month')
+    return summarize_months(results, start_date, months)
+
+# Number of buckets returned by default when no start date is given
+DEFAULT_TIMESERIES_PERIODS = {"day": 30, "week": 12, "month": 12, "year": 5}
+MAX_TIMESERIES_PERIODS = 1000
+
+def get_expense_timeseries(db: Session, user_id: int, granularity: str = "month",
+                           start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                           category_id: Optional[int] = None):
+    """Get gap-free expense summaries per calendar day, week, month or year
+
+    Buckets are aligned to calendar boundaries (ISO weeks start on Monday)
+    and periods without expenses are returned with zero totals. On
+    PostgreSQL the buckets come from generate_series over date_trunc in
+    one statement; elsewhere expenses are grouped by an equivalent SQL
+    bucket expression and gaps are filled in Python.
+    """
+    if granularity not in periods.GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Granularity must be one of: {', '.join(periods.GRANULARITIES)}"
+        )
+    
+    # Stored dates are naive UTC; comparing them with aware bounds would raise
+    start_date, end_date = periods.naive_utc(start_date), periods.naive_utc(end_date)
+    end_date = end_date or datetime.now()
+    first_bucket = periods.shift(
+        periods.truncate(end_date, granularity), granularity, 1 - DEFAULT_TIMESERIES_PERIODS[granularity]
+    ) if start_date is None else periods.truncate(start_date, granularity)
+    start_date = start_date or first_bucket
+    
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End date must be after start date"
+        )
     
-    results = query.all()
+    buckets = [first_bucket]
+    while periods.shift(buckets[-1], granularity) <= end_date:
+        buckets.append(periods.shift(buckets[-1], granularity))
+        if len(buckets) > MAX_TIMESERIES_PERIODS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Time series is limited to {MAX_TIMESERIES_PERIODS} periods"
+            )
+    
+    expense_filter = [
+        Expense.user_id == user_id,
+        Expense.date >= start_date,
+        Expense.date <= end_date
+    ]
+    if category_id:
+        expense_filter.append(Expense.category_id == category_id)
+    
+    if db.get_bind().dialect.name == "postgresql":
+        step = literal_column(f"interval '1 {granularity}'")
+        series = select(
+            func.generate_series(
+                func.date_trunc(granularity, cast(literal(start_date), DateTime)),
+                func.date_trunc(granularity, cast(literal(end_date), DateTime)),
+                step
+            ).label("bucket")
+        ).subquery()
+        bucket = series.c.bucket
+        query = db.query(
+            bucket,
+            func.sum(Expense.amount),
+            func.count(Expense.id),
+            func.min(Expense.amount),
+            func.max(Expense.amount)
+        ).select_from(series).outerjoin(
+            Expense, and_(Expense.date >= bucket, Expense.date < bucket + step, *expense_filter)
+        ).group_by(bucket)
+    else:
+        bucket = {
+            "day": func.date(Expense.date),
+            "week": func.date(Expense.date, "weekday 0", "-6 days"),
+            "month": func.strftime("%Y-%m-01", Expense.date),
+            "year": func.strftime("%Y-01-01", Expense.date),
+        }[granularity]
+        query = db.query(
+            bucket,
+            func.sum(Expense.amount),
+            func.count(Expense.id),
+            func.min(Expense.amount),
+            func.max(Expense.amount)
+        ).filter(*expense_filter).group_by(bucket)
+    
+    results = {}
+    for bucket_start, total, count, min_amount, max_amount in query.all():
+        if isinstance(bucket_start, str):
+            bucket_start = datetime.fromisoformat(bucket_start)
+        results[bucket_start.replace(tzinfo=None)] = (total, count, min_amount, max_amount)
     
     return [
-        TimePeriodExpenseSummary(
-            period=f"{result.year}-{result.month:02d}",  # Format: YYYY-MM
-            total=result.total,
-            count=result.count,
-            average=result.average,
-            min=result.min,
-            max=result.max
-        ) for result in results
-    ]
\ No newline at end of file
+        _period_summary(periods.label(bucket_start, granularity), results.get(bucket_start))
+        for bucket_start in buckets
+    ]
@@ -0,0 +1,247 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, extract, delete, insert, select, or_, and_, case
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.models.expense import Expense
+from app.models.expense_rollup import ExpenseDailyRollup
+from app.utils import periods
+
+def _upsert(db: Session):
+    """The dialect's INSERT supporting ON CONFLICT, or None if it has none"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    else:
+        return None
+    return upsert
+
+def refresh_daily_rollup(db: Session, user_id: int, category_id: int, day: date):
+    """Recompute the rollup row for one (user, category, day) bucket from its expenses
+
+    Pending expense changes must be flushed first. Recomputing the bucket
+    instead of adjusting it keeps min/max correct when an expense leaves it.
+    The row is locked before the expenses are read, so a concurrent
+    add_to_daily_rollup is either already counted or waits and applies on
+    top; the result is written with an upsert so first writes cannot collide.
+    """
+    bucket = (
+        ExpenseDailyRollup.user_id == user_id,
+        ExpenseDailyRollup.category_id == category_id,
+        ExpenseDailyRollup.day == day
+    )
+    db.execute(select(ExpenseDailyRollup.day).where(*bucket).with_for_update())
+    
+    day_start = datetime.combine(day, time.min)
+    result = db.query(
+        func.sum(Expense.amount).label("total"),
+        func.count(Expense.id).label("count"),
+        func.min(Expense.amount).label("min"),
+        func.max(Expense.amount).label("max")
+    ).filter(
+        Expense.user_id == user_id,
+        Expense.category_id == category_id,
+        Expense.date >= day_start,
+        Expense.date < day_start + timedelta(days=1)
+    ).first()
+    
+    # Drop buckets that no longer have any expenses
+    if not result.count:
+        db.execute(delete(ExpenseDailyRollup).where(*bucket))
+        return
+    
+    values = {
+        "user_id": user_id, "category_id": category_id, "day": day,
+        "total": result.total, "count": result.count, "min_amount": result.min, "max_amount": result.max,
+    }
+    upsert = _upsert(db)
+    if upsert is None:
+        db.merge(ExpenseDailyRollup(**values))
+        return
+    
+    statement = upsert(ExpenseDailyRollup).values(**values)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["user_id", "category_id", "day"],
+        set_={column: statement.excluded[column] for column in ("total", "count", "min_amount", "max_amount")}
+    ))
+
+def add_to_daily_rollup(db: Session, user_id: int, category_id: int, day: date, amount: float):
+    """Fold one new expense into its rollup bucket with a single upsert
+
+    Only valid for additions; removing an expense from a bucket can change
+    its min/max, which needs refresh_daily_rollup.
+    """
+    upsert = _upsert(db)
+    if upsert is None:
+        refresh_daily_rollup(db, user_id, category_id, day)
+        return
+    
+    statement = upsert(ExpenseDailyRollup).values(
+        user_id=user_id, category_id=category_id, day=day,
+        total=amount, count=1, min_amount=amount, max_amount=amount
+    )
+    excluded = statement.excluded
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["user_id", "category_id", "day"],
+        set_={
+            "total": ExpenseDailyRollup.total + excluded.total,
+            "count": ExpenseDailyRollup.count + 1,
+            "min_amount": case(
+                (excluded.min_amount < ExpenseDailyRollup.min_amount, excluded.min_amount),
+                else_=ExpenseDailyRollup.min_amount
+            ),
+            "max_amount": case(
+                (excluded.max_amount > ExpenseDailyRollup.max_amount, excluded.max_amount),
+                else_=ExpenseDailyRollup.max_amount
+            ),
+        }
+    ))
+
+def rebuild_daily_rollups(db: Session, user_id: Optional[int] = None,
+                          start_day: Optional[date] = None, end_day: Optional[date] = None,
+                          category_ids: Optional[Iterable[int]] = None, commit: bool = True):
+    """Rebuild rollup rows from the expenses table
+
+    Rebuilds everything by default; user_id, the inclusive start_day/end_day
+    range and category_ids narrow the rebuild to the buckets they select.
+    Pass commit=False to rebuild inside the caller's transaction.
+    """
+    day = func.date(Expense.date)
+    source = select(
+        Expense.user_id,
+        Expense.category_id,
+        day,
+        func.sum(Expense.amount),
+        func.count(Expense.id),
+        func.min(Expense.amount),
+        func.max(Expense.amount)
+    ).group_by(Expense.user_id, Expense.category_id, day)
+    delete_query = db.query(ExpenseDailyRollup)
+    
+    if user_id is not None:
+        source = source.where(Expense.user_id == user_id)
+        delete_query = delete_query.filter(ExpenseDailyRollup.user_id == user_id)
+    if start_day is not None:
+        source = source.where(Expense.date >= datetime.combine(start_day, time.min))
+        delete_query = delete_query.filter(ExpenseDailyRollup.day >= start_day)
+    if end_day is not None:
+        source = source.where(Expense.date < datetime.combine(end_day + timedelta(days=1), time.min))
+        delete_query = delete_query.filter(ExpenseDailyRollup.day <= end_day)
+    if category_ids is not None:
+        category_ids = list(category_ids)
+        source = source.where(Expense.category_id.in_(category_ids))
+        delete_query = delete_query.filter(ExpenseDailyRollup.category_id.in_(category_ids))
+    
+    delete_query.delete(synchronize_session=False)
+    db.execute(insert(ExpenseDailyRollup).from_select(
+        ["user_id", "category_id", "day", "total", "count", "min_amount", "max_amount"],
+        source
+    ))
+    if commit:
+        db.commit()
+
+def _split_range(start_date: Optional[datetime], end_date: Optional[datetime]):
+    """Split an inclusive datetime range into whole days and partial-day edges
+
+    Aware datetimes are converted to naive UTC first. Returns
+    (first_day, last_day, edges): the rollup covers first_day..last_day
+    (None meaning unbounded) and edges lists the (start, end) datetime ranges,
+    end inclusive, that must be read from raw expenses.
+    """
+    start_date, end_date = periods.naive_utc(start_date), periods.naive_utc(end_date)
+    first_day = last_day = None
+    edges = []
+    
+    if start_date is not None:
+        first_day = start_date.date()
+        if start_date.time() != time.min:
+            first_day += timedelta(days=1)
+            edge_end = datetime.combine(first_day, time.min) - timedelta(microseconds=1)
+            if end_date is not None and end_date < edge_end:
+                return first_day, first_day - timedelta(days=1), [(start_date, end_date)]
+            edges.append((start_date, edge_end))
+    
+    if end_date is not None:
+        last_day = end_date.date()
+        if end_date.time() != time.max:
+            last_day -= timedelta(days=1)
+            edge_start = datetime.combine(end_date.date(), time.min)
+            if start_date is not None and start_date > edge_start:
+                edge_start = start_date
+            edges.append((edge_start, end_date))
+    
+    return first_day, last_day, edges
+
+def merge_aggregates(merged: Dict[Tuple, list], key: Tuple, total, count, min_amount, max_amount):
+    """Fold one group's aggregates into merged[key] as [total, count, min, max]"""
+    if key not in merged:
+        merged[key] = [total, count, min_amount, max_amount]
+        return
+    current = merged[key]
+    current[0] += total
+    current[1] += count
+    current[2] = min(current[2], min_amount)
+    current[3] = max(current[3], max_amount)
+
+def aggregate_expenses(db: Session, user_id: int, start_date: Optional[datetime] = None,
+                       end_date: Optional[datetime] = None,
+                       group_by: Optional[str] = None) -> Dict[Tuple, list]:
+    """Aggregate a user's expenses in an inclusive date range from the daily rollup
+
+    group_by is None, "category" or "month". Whole days are read from the
+    rollup and partial days at the edges of the range from raw expenses.
+    Returns a dict mapping the group key tuple to [total, count, min, max].
+    """
+    first_day, last_day, edges = _split_range(start_date, end_date)
+    
+    if group_by == "category":
+        rollup_keys = [ExpenseDailyRollup.category_id]
+        expense_keys = [Expense.category_id]
+    elif group_by == "month":
+        rollup_keys = [extract('year', ExpenseDailyRollup.day), extract('month', ExpenseDailyRollup.day)]
+        expense_keys = [extract('year', Expense.date), extract('month', Expense.date)]
+    else:
+        rollup_keys = []
+        expense_keys = []
+    
+    results = []
+    
+    # Whole days come from the rollup
+    if first_day is None or last_day is None or first_day <= last_day:
+        query = db.query(
+            *rollup_keys,
+            func.sum(ExpenseDailyRollup.total),
+            func.sum(ExpenseDailyRollup.count),
+            func.min(ExpenseDailyRollup.min_amount),
+            func.max(ExpenseDailyRollup.max_amount)
+        ).filter(ExpenseDailyRollup.user_id == user_id)
+        if first_day is not None:
+            query = query.filter(ExpenseDailyRollup.day >= first_day)
+        if last_day is not None:
+            query = query.filter(ExpenseDailyRollup.day <= last_day)
+        results += query.group_by(*rollup_keys).all()
+    
+    # Partial days at the edges come from raw expenses
+    if edges:
+        query = db.query(
+            *expense_keys,
+            func.sum(Expense.amount),
+            func.count(Expense.id),
+            func.min(Expense.amount),
+            func.max(Expense.amount)
+        ).filter(
+            Expense.user_id == user_id,
+            or_(*[and_(Expense.date >= lo, Expense.date <= hi) for lo, hi in edges])
+        )
+        results += query.group_by(*expense_keys).all()
+    
+    # Merge both sources per group key
+    merged = {}
+    for row in results:
+        *key, total, count, min_amount, max_amount = row
+        if count:
+            merge_aggregates(merged, tuple(int(k) for k in key), total, count, min_amount, max_amount)
+    
+    return merged
@@ -1,9 +1,10 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from typing import Optional
 
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.utils.security import get_password_hash
+from app.utils.security import get_password_hash, user_cache
 
 def get_user_by_email(db: Session, email: str):
     """Get a user by email"""
@@ -17,8 +18,28 @@ def get_user_by_id(db: Session, user_id: int):
     """Get a user by ID"""
     return db.query(User).filter(User.id == user_id).first()
 
-def create_user(db: Session, user_data: UserCreate):
-    """Create a new user"""
+def get_data_version(db: Session, user_id: int) -> int:
+    """Get the version counter of a user's expenses, budgets and categories"""
+    return db.query(User.data_version).filter(User.id == user_id).scalar() or 0
+
+def bump_data_version(db: Session, user_id: int):
+    """Increment a user's data version in the caller's transaction
+
+    Every write to expenses, budgets or categories calls this before
+    committing, so anything keyed by the version can never be stale.
+    """
+    db.query(User).filter(User.id == user_id).update(
+        # Keep updated_at as is; it tracks changes to the profile itself
+        {User.data_version: User.data_version + 1, User.updated_at: User.updated_at},
+        synchronize_session=False
+    )
+
+def create_user(db: Session, user_data: UserCreate, hashed_password: Optional[str] = None):
+    """Create a new user
+
+    Callers on the event loop should pass a hashed_password computed with
+    password_hasher; otherwise the password is hashed here.
+    """
     # Check if email already exists
     if get_user_by_email(db, user_data.email):
         raise HTTPException(
@@ -34,7 +55,8 @@ def create_user(db: Session, user_data: UserCreate):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user_data.password)
     db_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -47,8 +69,9 @@ def create_user(db: Session, user_data: UserCreate):
     
     return db_user
 
-def update_user(db: Session, user_id: int, user_data: UserUpdate):
-    """Update existing user"""
+def update_user(db: Session, user_id: int, user_data: UserUpdate,
+                hashed_password: Optional[str] = None):
+    """Update existing user, optionally with a password already hashed by the caller"""
     db_user = get_user_by_id(db, user_id)
     if not db_user:
         raise HTTPException(
@@ -77,7 +100,8 @@ def update_user(db: Session, user_id: int, user_data: UserUpdate):
     
     # Hash password if included
     if 'password' in update_data:
-        update_data['hashed_password'] = get_password_hash(update_data.pop('password'))
+        password = update_data.pop('password')
+        update_data['hashed_password'] = hashed_password or get_password_hash(password)
     
     for key, value in update_data.items():
         setattr(db_user, key, value)
@@ -85,6 +109,9 @@ def update_user(db: Session, user_id: int, user_data: UserUpdate):
     db.commit()
     db.refresh(db_user)
     
+    # Drop the cached record used by get_current_user
+    user_cache.delete(user_id)
+    
     return db_user
 
 def deactivate_user(db: Session, user_id: int):
@@ -98,5 +125,7 @@ def deactivate_user(db: Session, user_id: int):
     
     db_user.is_active = False
     db.commit()
+    db.refresh(db_user)
+    user_cache.delete(user_id)
     
     return db_user
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""Create or upgrade the database schema.
+
+The API no longer creates tables on import or startup; run this first:
+
+    python -m app.tools.bootstrap               # apply all migrations (alembic upgrade head)
+    python -m app.tools.bootstrap --create-all  # create missing tables from the models instead
+
+The migrations target PostgreSQL. --create-all is meant for throwaway and
+SQLite databases: it skips migration history and PostgreSQL-only steps such
+as partitioning expenses.
+"""
+import argparse
+import os
+
+from app.config import settings
+from app.database import Base, init_engines
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "migrations")
+
+def create_all():
+    """Create any missing tables straight from the models"""
+    # Register every model on Base.metadata
+    from app.models import budget, category, expense, expense_rollup, user
+    
+    Base.metadata.create_all(bind=init_engines())
+
+def upgrade(revision: str = "head"):
+    """Apply migrations up to a revision"""
+    from alembic import command
+    from alembic.config import Config
+    
+    config = Config()
+    config.set_main_option("script_location", os.path.abspath(MIGRATIONS_DIR))
+    # Config values are interpolated, so a literal % must be doubled
+    config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+    command.upgrade(config, revision)
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or upgrade the database schema")
+    parser.add_argument("--create-all", action="store_true",
+                        help="Create tables from the models instead of running migrations")
+    args = parser.parse_args()
+    if not settings.DATABASE_URL:
+        parser.error("DATABASE_URL is not set")
+    
+    if args.create_all:
+        create_all()
+        print("Database tables created")
+    else:
+        upgrade()
+        print("Database migrated to the latest revision")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Measure API throughput and latency under many concurrent clients.
+
+Run the API (e.g. `uvicorn app.main:app --workers 1`) and point this at it:
+
+    python -m app.tools.concurrency_bench --base-url http://localhost:8000 --clients 200
+
+Run it once against the build under test and once against a baseline to
+compare. With --json the results are printed as a single JSON object.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+
+async def _prepare(client: httpx.AsyncClient, expenses: int):
+    """Register a throwaway user with some data and return auth headers"""
+    suffix = uuid.uuid4().hex[:12]
+    email = f"bench-{suffix}@example.com"
+    password = "bench-password"
+    response = await client.post("/api/users/register", json={
+        "email": email, "username": f"bench-{suffix}", "password": password
+    })
+    response.raise_for_status()
+    response = await client.post("/api/token", data={"username": email, "password": password})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    
+    response = await client.post("/api/categories/", json={"name": "Benchmark"}, headers=headers)
+    response.raise_for_status()
+    category_id = response.json()["id"]
+    for i in range(expenses):
+        response = await client.post("/api/expenses/", json={
+            "amount": 1 + i % 50,
+            "date": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T12:00:00",
+            "category_id": category_id,
+        }, headers=headers)
+        response.raise_for_status()
+    
+    return headers
+
+async def _client(client: httpx.AsyncClient, paths, headers, requests: int, latencies: list, errors: list):
+    """Issue requests round-robin over paths, recording latencies"""
+    for i in range(requests):
+        started = time.perf_counter()
+        try:
+            response = await client.get(paths[i % len(paths)], headers=headers)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - started)
+
+async def run(base_url: str, clients: int, requests: int, expenses: int):
+    """Run the benchmark and return a results dict"""
+    paths = ["/api/expenses/?limit=50", "/api/expenses/summary", "/api/budgets/progress"]
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        headers = await _prepare(client, expenses)
+    
+        latencies, errors = [], []
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            _client(client, paths, headers, requests, latencies, errors) for _ in range(clients)
+        ])
+        elapsed = time.perf_counter() - started
+    
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(quantiles[49] * 1000, 2),
+            "p95": round(quantiles[94] * 1000, 2),
+            "p99": round(quantiles[98] * 1000, 2),
+            "max": round(max(latencies) * 1000, 2),
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent client API benchmark")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=200, help="Number of concurrent clients")
+    parser.add_argument("--requests", type=int, default=20, help="Requests issued by each client")
+    parser.add_argument("--expenses", type=int, default=200, help="Expenses seeded for the benchmark user")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    
+    results = asyncio.run(run(args.base_url, args.clients, args.requests, args.expenses))
+    
+    if args.json:
+        print(json.dumps(results))
+        return
+    
+    print(f"{results['requests']} requests from {results['clients']} clients in {results['elapsed_s']}s "
+          f"({results['errors']} errors)")
+    print(f"Throughput: {results['throughput_rps']} req/s")
+    latency = results["latency_ms"]
+    print(f"Latency: p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+          f"p99 {latency['p99']} ms, max {latency['max']} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Maintain and verify the monthly partitions of the expenses table (PostgreSQL).
+
+The expenses table is range partitioned by month on date (see migration
+6040b5936ed8), with partitions named expenses_YYYY_MM and a default partition
+for anything outside them.
+
+    python -m app.tools.partitions list
+    python -m app.tools.partitions create [--ahead 3]
+    python -m app.tools.partitions detach --before 2020-01
+    python -m app.tools.partitions verify --user-id 1 --start 2024-05-01 --end 2024-05-31 [--query text]
+
+Run `create` regularly (e.g. daily from cron) so new expenses never land in the
+default partition. `detach` leaves old partitions as standalone tables for
+archiving; the daily rollups keep their totals until rollups are rebuilt.
+`verify` runs the expense service queries with EXPLAIN and exits non-zero if
+any of them scans a partition outside the requested date range.
+"""
+import argparse
+import re
+import sys
+from datetime import datetime
+
+from sqlalchemy import event, text
+
+from app.database import SessionLocal, init_engines
+from app.utils import periods
+
+PARTITION_NAME = re.compile(r"^expenses_(\d{4})_(\d{2})$")
+
+def partition_name(month: datetime) -> str:
+    return f"expenses_{month:%Y_%m}"
+
+def partition_month(name: str):
+    """Return the month a partition covers, or None for the default partition"""
+    match = PARTITION_NAME.match(name)
+    return datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+def list_partitions(connection):
+    """Return (name, bounds) of every partition currently attached to expenses"""
+    return connection.execute(text("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'expenses'::regclass
+        ORDER BY child.relname
+    """)).all()
+
+def _move_default_rows(connection, default: str, name: str, bounds: str, start: datetime, end: datetime):
+    """Create a partition from the rows the default partition holds for its range, then attach it"""
+    # search_vector is generated, so only the stored columns are copied
+    columns = ", ".join(connection.execute(text("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'expenses' AND is_generated = 'NEVER'
+        ORDER BY ordinal_position
+    """)).scalars())
+    connection.execute(text(
+        f"CREATE TABLE {name} (LIKE expenses INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED)"
+    ))
+    connection.execute(text(
+        f"WITH moved AS (DELETE FROM {default} WHERE date >= :start AND date < :end RETURNING {columns}) "
+        f"INSERT INTO {name} ({columns}) SELECT {columns} FROM moved"
+    ), {"start": start, "end": end})
+    connection.execute(text(f"ALTER TABLE expenses ATTACH PARTITION {name} {bounds}"))
+
+def create_partitions(connection, ahead: int = 3):
+    """Create any missing partitions from the current month through `ahead` months from now
+    
+    Rows the default partition already holds for a new month are moved into
+    that month's partition in the same transaction, since PostgreSQL refuses to
+    create a partition whose range overlaps rows in the default partition.
+    """
+    partitions = list_partitions(connection)
+    existing = {name for name, _ in partitions}
+    default = next((name for name, bounds in partitions if bounds == "DEFAULT"), None)
+    month = periods.truncate(datetime.now(), "month")
+    created = []
+    for _ in range(ahead + 1):
+        name = partition_name(month)
+        end = periods.shift(month, "month")
+        if name not in existing:
+            bounds = f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+            if default is not None and connection.execute(text(
+                f"SELECT EXISTS (SELECT 1 FROM {default} WHERE date >= :start AND date < :end)"
+            ), {"start": month, "end": end}).scalar():
+                _move_default_rows(connection, default, name, bounds, month, end)
+            else:
+                connection.execute(text(f"CREATE TABLE {name} PARTITION OF expenses {bounds}"))
+            created.append(name)
+        month = end
+    return created
+
+def detach_partitions(connection, before: datetime):
+    """Detach the monthly partitions of months before `before`"""
+    detached = []
+    for name, _ in list_partitions(connection):
+        month = partition_month(name)
+        if month is not None and month < before:
+            connection.execute(text(f"ALTER TABLE expenses DETACH PARTITION {name}"))
+            detached.append(name)
+    return detached
+
+def _scanned_relations(plan: dict, relations: set):
+    """Collect the names of all relations scanned anywhere in an EXPLAIN plan"""
+    if "Relation Name" in plan:
+        relations.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        _scanned_relations(child, relations)
+    return relations
+
+def verify_pruning(user_id: int, start_date: datetime, end_date: datetime, query: str = None):
+    """EXPLAIN the expense service queries for a date range and report the partitions they scan
+
+    Returns a list of (service, statement, scanned partitions, unexpected
+    partitions) for every statement that reads expenses.
+    """
+    # Imported here so the maintenance commands do not load the service layer
+    from app.services.expense import (
+        get_expenses, get_expense_summary, get_expenses_by_category, get_expense_timeseries, search_expenses
+    )
+    
+    calls = [
+        ("get_expenses", lambda db: get_expenses(db, user_id, start_date=start_date, end_date=end_date)),
+        ("get_expense_summary", lambda db: get_expense_summary(db, user_id, start_date, end_date)),
+        ("get_expenses_by_category", lambda db: get_expenses_by_category(db, user_id, start_date, end_date)),
+        ("get_expense_timeseries", lambda db: get_expense_timeseries(
+            db, user_id, "day", start_date=start_date, end_date=end_date
+        )),
+    ]
+    if query:
+        calls.append(("search_expenses", lambda db: search_expenses(
+            db, user_id, query, start_date=start_date, end_date=end_date
+        )))
+    
+    engine = init_engines()
+    db = SessionLocal()
+    try:
+        partitions = {name for name, _ in list_partitions(db.connection())}
+        # Monthly partitions overlapping the range; the default partition is never expected
+        expected = set()
+        for name in partitions:
+            month = partition_month(name)
+            if month is not None and month <= end_date and periods.shift(month, "month") > start_date:
+                expected.add(name)
+        
+        results = []
+        for service, call in calls:
+            statements = []
+            
+            def capture(conn, cursor, statement, parameters, context, executemany):
+                if "expenses" in statement and statement.lstrip().upper().startswith("SELECT"):
+                    statements.append((statement, parameters))
+            
+            event.listen(engine, "before_cursor_execute", capture)
+            try:
+                call(db)
+            finally:
+                event.remove(engine, "before_cursor_execute", capture)
+            
+            for statement, parameters in statements:
+                plan = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+                scanned = _scanned_relations(plan[0]["Plan"], set()) & partitions
+                results.append((service, statement, scanned, scanned - expected))
+        return results
+    finally:
+        db.rollback()
+        db.close()
+
+def _month_arg(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m")
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain and verify expense partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    commands.add_parser("list", help="List attached partitions")
+    
+    create = commands.add_parser("create", help="Create partitions for upcoming months")
+    create.add_argument("--ahead", type=int, default=3, help="Months past the current one to create")
+    
+    detach = commands.add_parser("detach", help="Detach partitions of old months")
+    detach.add_argument("--before", type=_month_arg, required=True, help="First month to keep (YYYY-MM)")
+    
+    verify = commands.add_parser("verify", help="Check that expense queries prune partitions")
+    verify.add_argument("--user-id", type=int, required=True)
+    verify.add_argument("--start", type=datetime.fromisoformat, required=True)
+    verify.add_argument("--end", type=datetime.fromisoformat, required=True)
+    verify.add_argument("--query", default=None, help="Also verify search_expenses with this text")
+    args = parser.parse_args()
+    
+    engine = init_engines()
+    if engine.dialect.name != "postgresql":
+        sys.exit("Partitioning is only supported on PostgreSQL")
+    
+    if args.command == "verify":
+        failed = False
+        for service, statement, scanned, unexpected in verify_pruning(args.user_id, args.start, args.end, args.query):
+            failed = failed or bool(unexpected)
+            print(f"{'NOT PRUNED' if unexpected else 'ok':<10} {service}: {', '.join(sorted(scanned)) or 'no partitions'}")
+            if unexpected:
+                print(f"           unexpected: {', '.join(sorted(unexpected))}")
+                print(f"           {' '.join(statement.split())[:200]}")
+        sys.exit(1 if failed else 0)
+    
+    with engine.begin() as connection:
+        if args.command == "list":
+            for name, bounds in list_partitions(connection):
+                print(f"{name}: {bounds}")
+        elif args.command == "create":
+            created = create_partitions(connection, args.ahead)
+            print(f"Created {len(created)} partitions" + (f": {', '.join(created)}" if created else ""))
+        elif args.command == "detach":
+            detached = detach_partitions(connection, args.before)
+            print(f"Detached {len(detached)} partitions" + (f": {', '.join(detached)}" if detached else ""))
+
+if __name__ == "__main__":
+    main()
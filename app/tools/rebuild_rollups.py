@@ -0,0 +1,25 @@
+"""Rebuild the expense daily rollup table from the expenses table.
+
+Usage: python -m app.tools.rebuild_rollups [--user-id ID]
+"""
+import argparse
+
+from app.database import SessionLocal, init_engines
+from app.services.rollup import rebuild_daily_rollups
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild expense daily rollups")
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild rollups for this user")
+    args = parser.parse_args()
+    
+    init_engines()
+    db = SessionLocal()
+    try:
+        rebuild_daily_rollups(db, args.user_id)
+    finally:
+        db.close()
+    
+    print("Expense daily rollups rebuilt")
+
+if __name__ == "__main__":
+    main()
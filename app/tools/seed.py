@@ -0,0 +1,256 @@
+"""Generate synthetic users, categories, budgets and expenses.
+
+    python -m app.tools.seed --users 100 --expenses-per-user 10000 [--seed 42]
+        [--end-date 2026-01-01] [--amounts lognormal] [--seasonality 0.3]
+        [--category-skew 1.1] [--database-url URL] [--create-all]
+
+Rows are bulk-loaded through the models (COPY on PostgreSQL) rather than
+the API, and everything is drawn from one random.Random and dated relative
+to --end-date, so the same seed and end date always produce the same data. Amounts, dates and categories follow the
+distributions configured on Distributions.
+"""
+import argparse
+import bisect
+import math
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.passwords import hash_password
+from app.database import Base, SessionLocal, init_engines
+from app.models.budget import Budget
+from app.models.category import Category
+from app.models.user import User
+from app.services.expense import bulk_insert_expenses
+from app.services.rollup import rebuild_daily_rollups
+
+CATEGORY_NAMES = [
+    "Groceries", "Rent", "Dining", "Transport", "Utilities", "Entertainment",
+    "Health", "Shopping", "Travel", "Education", "Gifts", "Subscriptions",
+]
+DESCRIPTIONS = [
+    "Coffee", "Lunch", "Dinner with friends", "Weekly groceries", "Bus ticket", "Taxi",
+    "Electricity bill", "Internet", "Movie tickets", "Pharmacy", "New shoes", "Flight",
+    "Hotel", "Online course", "Birthday present", "Streaming service",
+]
+PAYMENT_METHODS = ["credit card", "debit card", "cash", "bank transfer", "mobile"]
+
+# Every generated user has this password
+PASSWORD = "password123"
+
+# Expenses are loaded in chunks of this many rows
+CHUNK_SIZE = 50000
+
+# Default for --end-date; fixed so that runs on different days match
+DEFAULT_END_DATE = date(2026, 1, 1)
+
+AMOUNT_DISTRIBUTIONS = ["uniform", "lognormal", "pareto"]
+
+class Distributions:
+    """How generated expense amounts, dates and categories are distributed
+
+    amounts: "uniform" between 1 and 2 * amount_median, "lognormal" around
+    amount_median with amount_sigma, or "pareto" with pareto_alpha (most
+    amounts near the minimum, a long tail of large ones). Amounts are capped
+    at max_amount.
+    seasonality: 0 spreads dates evenly; up to 1 makes December busier and
+    June quieter by that fraction. weekend_factor scales weekend days.
+    category_skew: Zipf exponent over each user's categories; 0 is uniform,
+    around 1 gives a few dominant categories.
+    """
+
+    def __init__(self, amounts: str = "lognormal", amount_median: float = 25.0, amount_sigma: float = 1.0,
+                 pareto_alpha: float = 1.5, max_amount: float = 10000.0, seasonality: float = 0.3,
+                 weekend_factor: float = 1.3, category_skew: float = 1.0, note_rate: float = 0.1):
+        if amounts not in AMOUNT_DISTRIBUTIONS:
+            raise ValueError(f"amounts must be one of {', '.join(AMOUNT_DISTRIBUTIONS)}")
+        if not 0 <= seasonality <= 1:
+            raise ValueError("seasonality must be between 0 and 1")
+        self.amounts = amounts
+        self.amount_median = amount_median
+        self.amount_sigma = amount_sigma
+        self.pareto_alpha = pareto_alpha
+        self.max_amount = max_amount
+        self.seasonality = seasonality
+        self.weekend_factor = weekend_factor
+        self.category_skew = category_skew
+        self.note_rate = note_rate
+
+    def amount(self, rng: random.Random) -> float:
+        if self.amounts == "uniform":
+            value = rng.uniform(1, 2 * self.amount_median)
+        elif self.amounts == "lognormal":
+            value = rng.lognormvariate(math.log(self.amount_median), self.amount_sigma)
+        else:
+            # Scaled so the median matches amount_median
+            value = self.amount_median / 2 ** (1 / self.pareto_alpha) * rng.paretovariate(self.pareto_alpha)
+        return round(min(max(value, 0.01), self.max_amount), 2)
+
+    def date_weight(self, moment: datetime) -> float:
+        """Relative likelihood of an expense at this moment"""
+        weight = 1 + self.seasonality * math.cos(2 * math.pi * (moment.month - 12) / 12)
+        if moment.weekday() >= 5:
+            weight *= self.weekend_factor
+        return weight
+
+    def date(self, rng: random.Random, start: datetime, span: float) -> datetime:
+        """Draw a moment in [start, start + span seconds) by rejection sampling"""
+        ceiling = (1 + self.seasonality) * max(self.weekend_factor, 1)
+        while True:
+            moment = start + timedelta(seconds=int(rng.random() * span))
+            if rng.random() * ceiling < self.date_weight(moment):
+                return moment
+
+    def category_weights(self, count: int) -> List[float]:
+        """Cumulative Zipf weights for a user's categories, most popular first"""
+        weights, total = [], 0.0
+        for rank in range(1, count + 1):
+            total += 1 / rank ** self.category_skew
+            weights.append(total)
+        return weights
+
+def create_users(db: Session, rng: random.Random, count: int, budget_year: int, categories_per_user: int = 8,
+                 budgets_per_user: int = 3, first_index: int = 0) -> Dict[int, List[int]]:
+    """Create users with categories and budgets for budget_year; returns category ids by user id"""
+    hashed_password = hash_password(PASSWORD, settings.BCRYPT_ROUNDS)
+    users = db.execute(insert(User).returning(User.id), [
+        {
+            "email": f"user{index}@example.com",
+            "username": f"user{index}",
+            "hashed_password": hashed_password,
+            "is_active": True,
+        } for index in range(first_index, first_index + count)
+    ]).scalars().all()
+    
+    tenants = {}
+    for user_id in users:
+        names = rng.sample(CATEGORY_NAMES, min(categories_per_user, len(CATEGORY_NAMES)))
+        tenants[user_id] = db.execute(insert(Category).returning(Category.id), [
+            {"name": name, "user_id": user_id} for name in names
+        ]).scalars().all()
+    
+    # An overall budget plus per-category ones
+    year_start = datetime(budget_year, 1, 1)
+    budgets = []
+    for user_id, category_ids in tenants.items():
+        for index in range(budgets_per_user):
+            category_id = rng.choice(category_ids) if index else None
+            budgets.append({
+                "name": f"Budget {index + 1}",
+                "amount": round(rng.uniform(200, 2000), 2),
+                "start_date": year_start,
+                "end_date": year_start.replace(year=year_start.year + 1) - timedelta(seconds=1),
+                "is_active": True,
+                "user_id": user_id,
+                "category_id": category_id,
+            })
+    if budgets:
+        db.execute(insert(Budget), budgets)
+    
+    db.commit()
+    return tenants
+
+def generate_expenses(rng: random.Random, user_id: int, category_ids: List[int], count: int,
+                      start: datetime, end: datetime, distributions: Distributions = None):
+    """Yield expense rows for one user dated within [start, end)"""
+    distributions = distributions or Distributions()
+    span = (end - start).total_seconds()
+    # Each user gets their own popularity order over their categories
+    ranked = rng.sample(category_ids, len(category_ids))
+    weights = distributions.category_weights(len(ranked))
+    for _ in range(count):
+        description = rng.choice(DESCRIPTIONS)
+        yield {
+            "amount": distributions.amount(rng),
+            "description": description,
+            "date": distributions.date(rng, start, span),
+            "note": f"{description} ({rng.randrange(1000)})" if rng.random() < distributions.note_rate else None,
+            "payment_method": rng.choice(PAYMENT_METHODS),
+            "user_id": user_id,
+            "category_id": ranked[bisect.bisect(weights, rng.random() * weights[-1])],
+        }
+
+def add_expenses(db: Session, rng: random.Random, tenants: Dict[int, List[int]], per_user: int,
+                 start: datetime, end: datetime, distributions: Distributions = None):
+    """Bulk-load per_user expenses for every user and rebuild their rollups"""
+    for user_id, category_ids in tenants.items():
+        rows = generate_expenses(rng, user_id, category_ids, per_user, start, end, distributions)
+        while True:
+            chunk = [row for _, row in zip(range(CHUNK_SIZE), rows)]
+            if not chunk:
+                break
+            bulk_insert_expenses(db, chunk)
+        rebuild_daily_rollups(db, user_id, commit=False)
+        db.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic expense data")
+    parser.add_argument("--database-url", default=None, help="Defaults to the configured DATABASE_URL")
+    parser.add_argument("--create-all", action="store_true", help="Create missing tables first (SQLite scratch databases)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--expenses-per-user", type=int, default=10000)
+    parser.add_argument("--categories-per-user", type=int, default=8)
+    parser.add_argument("--budgets-per-user", type=int, default=3)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=DEFAULT_END_DATE,
+                        help="Expenses are dated before this day (YYYY-MM-DD); budgets cover the year before it")
+    parser.add_argument("--days", type=int, default=730, help="Expenses are dated within this many days back")
+    parser.add_argument("--first-index", type=int, default=None,
+                        help="Number for the first user{N}@example.com; defaults to the current user count")
+    parser.add_argument("--amounts", choices=AMOUNT_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--amount-median", type=float, default=25.0)
+    parser.add_argument("--amount-sigma", type=float, default=1.0, help="Spread of lognormal amounts")
+    parser.add_argument("--pareto-alpha", type=float, default=1.5, help="Tail index of Pareto amounts")
+    parser.add_argument("--seasonality", type=float, default=0.3, help="0 (flat) to 1 (strong December peak)")
+    parser.add_argument("--weekend-factor", type=float, default=1.3)
+    parser.add_argument("--category-skew", type=float, default=1.0, help="Zipf exponent; 0 is uniform")
+    parser.add_argument("--note-rate", type=float, default=0.1, help="Fraction of expenses with a note")
+    args = parser.parse_args()
+    
+    try:
+        distributions = Distributions(
+            amounts=args.amounts, amount_median=args.amount_median, amount_sigma=args.amount_sigma,
+            pareto_alpha=args.pareto_alpha, seasonality=args.seasonality, weekend_factor=args.weekend_factor,
+            category_skew=args.category_skew, note_rate=args.note_rate,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    
+    engine = init_engines(args.database_url)
+    if args.create_all:
+        Base.metadata.create_all(bind=engine)
+    
+    rng = random.Random(args.seed)
+    end = datetime.combine(args.end_date, datetime.min.time())
+    start = end - timedelta(days=args.days)
+    
+    db = SessionLocal()
+    try:
+        first_index = args.first_index
+        if first_index is None:
+            first_index = db.query(func.count(User.id)).scalar()
+        started = time.perf_counter()
+        tenants = create_users(
+            db, rng, args.users, (end - timedelta(days=1)).year, args.categories_per_user,
+            args.budgets_per_user, first_index
+        )
+        print(f"Created {len(tenants)} users in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        
+        started = time.perf_counter()
+        add_expenses(db, rng, tenants, args.expenses_per_user, start, end, distributions)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    
+    total = len(tenants) * args.expenses_per_user
+    print(f"Loaded {total} expenses in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/s)",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
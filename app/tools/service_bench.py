@@ -0,0 +1,368 @@
+"""Time the service functions against synthetic databases of growing size.
+
+    python -m app.tools.service_bench [--sizes 1000,10000,100000] [--users 10]
+        [--database-url postgresql://localhost/bench] [--output results.json]
+        [--compare baseline.json --threshold 0.2]
+
+Sizes are expenses per user; with the defaults the largest database holds 1M
+expenses. Without --database-url a temporary SQLite file is used. Point
+--database-url only at a scratch database: tables are created if missing and
+synthetic users are added.
+
+Every function in the expense, budget, category and user services is timed
+for one of the users. Write benchmarks undo their changes after each timed
+run so runs see the same data. Results are written as JSON; with --compare,
+functions whose median time grew by more than --threshold (and by at least
+--min-delta-ms) are reported as regressions and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.database import Base, SessionLocal, init_engines
+from app.models.expense import Expense
+from app.schemas.budget import BudgetCreate, BudgetUpdate
+from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseBulkUpdate, ExpenseSelection
+from app.schemas.user import UserCreate, UserUpdate
+from app.services import budget, category, expense, user
+from app.tools import seed
+
+# Expenses written by benchmarks are dated here, well clear of the seeded data
+SCRATCH_DATE = datetime(2100, 1, 1)
+
+class Case:
+    """One benchmarked call: prepare and undo run untimed around each timed run"""
+
+    def __init__(self, name, run, prepare=None, undo=None):
+        self.name = name
+        self.run = run
+        self.prepare = prepare
+        self.undo = undo
+
+def _expense_data(ctx, **overrides):
+    return ExpenseCreate(**{
+        "amount": 12.5, "date": SCRATCH_DATE, "category_id": ctx["category_ids"][0],
+        "description": "Benchmark", **overrides
+    })
+
+def _bulk_records(ctx, count):
+    return [
+        {"amount": 1 + i % 50, "date": SCRATCH_DATE + timedelta(hours=i), "category_id": ctx["category_ids"][i % 2]}
+        for i in range(count)
+    ]
+
+def _clear_scratch(db, ctx):
+    expense.bulk_delete_expenses(db, ExpenseSelection(start_date=SCRATCH_DATE), ctx["user_id"])
+
+def build_cases():
+    """The benchmark cases, named module.function[:variant]"""
+    counter = iter(range(10 ** 9))
+    
+    return [
+        # Expenses
+        Case("expense.get_expenses", lambda db, c, _: expense.get_expenses(db, c["user_id"], limit=100)),
+        Case("expense.get_expenses:filtered", lambda db, c, _: expense.get_expenses(
+            db, c["user_id"], limit=100, category_id=c["category_ids"][0],
+            start_date=c["recent"], end_date=c["now"]
+        )),
+        Case("expense.search_expenses", lambda db, c, _: expense.search_expenses(db, c["user_id"], "coffee")),
+        Case("expense.get_expense_export_query", lambda db, c, _: db.execute(
+            expense.get_expense_export_query(c["user_id"])
+        ).all()),
+        Case("expense.get_expense", lambda db, c, _: expense.get_expense(db, c["expense_id"], c["user_id"])),
+        Case("expense.create_expense",
+             lambda db, c, _: expense.create_expense(db, _expense_data(c), c["user_id"]),
+             undo=lambda db, c, created: expense.delete_expense(db, created.id, c["user_id"])),
+        Case("expense.update_expense",
+             lambda db, c, _: expense.update_expense(
+                 db, c["expense_id"], ExpenseUpdate(category_id=c["category_ids"][1]), c["user_id"]
+             ),
+             prepare=lambda db, c: expense.get_expense(db, c["expense_id"], c["user_id"]).category_id,
+             undo=lambda db, c, _, original: expense.update_expense(
+                 db, c["expense_id"], ExpenseUpdate(category_id=original), c["user_id"]
+             )),
+        Case("expense.delete_expense",
+             lambda db, c, created: expense.delete_expense(db, created.id, c["user_id"]),
+             prepare=lambda db, c: expense.create_expense(db, _expense_data(c), c["user_id"])),
+        Case("expense.bulk_create_expenses",
+             lambda db, c, _: expense.bulk_create_expenses(db, _bulk_records(c, 1000), c["user_id"]),
+             undo=lambda db, c, *_: _clear_scratch(db, c)),
+        Case("expense.bulk_update_expenses",
+             lambda db, c, ids: expense.bulk_update_expenses(db, ExpenseBulkUpdate(
+                 ids=ids, changes={"category_id": c["category_ids"][1]}
+             ), c["user_id"]),
+             prepare=lambda db, c: [
+                 created_id for (created_id,) in db.query(Expense.id).filter(
+                     Expense.user_id == c["user_id"], Expense.category_id == c["category_ids"][0]
+                 ).limit(100)
+             ],
+             undo=lambda db, c, _, ids: expense.bulk_update_expenses(db, ExpenseBulkUpdate(
+                 ids=ids, changes={"category_id": c["category_ids"][0]}
+             ), c["user_id"])),
+        Case("expense.bulk_delete_expenses",
+             lambda db, c, _: _clear_scratch(db, c),
+             prepare=lambda db, c: expense.bulk_create_expenses(db, _bulk_records(c, 1000), c["user_id"])),
+        Case("expense.get_expense_summary", lambda db, c, _: expense.get_expense_summary(db, c["user_id"])),
+        Case("expense.get_expense_summary:range", lambda db, c, _: expense.get_expense_summary(
+            db, c["user_id"], c["recent"], c["now"]
+        )),
+        Case("expense.get_expenses_by_category",
+             lambda db, c, _: expense.get_expenses_by_category(db, c["user_id"])),
+        Case("expense.get_monthly_expenses", lambda db, c, _: expense.get_monthly_expenses(db, c["user_id"], 12)),
+        Case("expense.get_expense_timeseries", lambda db, c, _: expense.get_expense_timeseries(
+            db, c["user_id"], "day", start_date=c["recent"], end_date=c["now"]
+        )),
+        
+        # Budgets
+        Case("budget.get_budgets", lambda db, c, _: budget.get_budgets(db, c["user_id"])),
+        Case("budget.get_budget", lambda db, c, _: budget.get_budget(db, c["budget_id"], c["user_id"])),
+        Case("budget.create_budget",
+             lambda db, c, _: budget.create_budget(db, BudgetCreate(
+                 amount=100, name="Benchmark", start_date=c["recent"], end_date=c["now"]
+             ), c["user_id"]),
+             undo=lambda db, c, created: budget.delete_budget(db, created.id, c["user_id"])),
+        Case("budget.update_budget",
+             lambda db, c, _: budget.update_budget(db, c["budget_id"], BudgetUpdate(amount=123), c["user_id"])),
+        Case("budget.delete_budget",
+             lambda db, c, created: budget.delete_budget(db, created.id, c["user_id"]),
+             prepare=lambda db, c: budget.create_budget(db, BudgetCreate(
+                 amount=100, name="Benchmark", start_date=c["recent"], end_date=c["now"]
+             ), c["user_id"])),
+        Case("budget.get_budget_progress",
+             lambda db, c, _: budget.get_budget_progress(db, c["budget_id"], c["user_id"])),
+        Case("budget.get_all_budget_progress",
+             lambda db, c, _: budget.get_all_budget_progress(db, c["user_id"])),
+        
+        # Categories
+        Case("category.get_categories", lambda db, c, _: category.get_categories(db, c["user_id"])),
+        Case("category.get_categories:stats", lambda db, c, _: category.get_categories(
+            db, c["user_id"], include_stats=True, sort="usage"
+        )),
+        Case("category.get_category",
+             lambda db, c, _: category.get_category(db, c["category_ids"][0], c["user_id"])),
+        Case("category.create_category",
+             lambda db, c, _: category.create_category(db, CategoryCreate(name=f"Bench {next(counter)}"), c["user_id"]),
+             undo=lambda db, c, created: category.delete_category(db, created.id, c["user_id"])),
+        Case("category.update_category",
+             lambda db, c, _: category.update_category(
+                 db, c["category_ids"][0], CategoryUpdate(color="#336699"), c["user_id"]
+             )),
+        Case("category.delete_category",
+             lambda db, c, created: category.delete_category(db, created.id, c["user_id"]),
+             prepare=lambda db, c: category.create_category(
+                 db, CategoryCreate(name=f"Bench {next(counter)}"), c["user_id"]
+             )),
+        Case("category.merge_category",
+             lambda db, c, source: category.merge_category(db, source, c["category_ids"][-1], c["user_id"]),
+             prepare=lambda db, c: _merge_source(db, c, f"Bench {next(counter)}"),
+             undo=lambda db, c, *_: _clear_scratch(db, c)),
+        
+        # Users
+        Case("user.get_user_by_email", lambda db, c, _: user.get_user_by_email(db, c["email"])),
+        Case("user.get_user_by_username", lambda db, c, _: user.get_user_by_username(db, c["username"])),
+        Case("user.get_user_by_id", lambda db, c, _: user.get_user_by_id(db, c["user_id"])),
+        Case("user.get_data_version", lambda db, c, _: user.get_data_version(db, c["user_id"])),
+        Case("user.bump_data_version", lambda db, c, _: (user.bump_data_version(db, c["user_id"]), db.commit())),
+        Case("user.create_user",
+             lambda db, c, _: user.create_user(db, UserCreate(
+                 email=f"bench{next(counter)}@example.com", username=f"bench{next(counter)}", password=seed.PASSWORD
+             ), hashed_password=c["hashed_password"]),
+             undo=lambda db, c, created: (db.delete(created), db.commit())),
+        Case("user.update_user",
+             lambda db, c, _: user.update_user(db, c["user_id"], UserUpdate(username=f"bench{next(counter)}")),
+             undo=lambda db, c, *_: user.update_user(db, c["user_id"], UserUpdate(username=c["username"]))),
+        Case("user.deactivate_user",
+             lambda db, c, created: user.deactivate_user(db, created.id),
+             prepare=lambda db, c: user.create_user(db, UserCreate(
+                 email=f"bench{next(counter)}@example.com", username=f"bench{next(counter)}", password=seed.PASSWORD
+             ), hashed_password=c["hashed_password"])),
+    ]
+
+def _merge_source(db, ctx, name):
+    """Create a category with a few scratch expenses to be merged away"""
+    source = category.create_category(db, CategoryCreate(name=name), ctx["user_id"])
+    expense.bulk_create_expenses(db, [
+        {"amount": 5, "date": SCRATCH_DATE + timedelta(days=i), "category_id": source.id} for i in range(20)
+    ], ctx["user_id"])
+    return source.id
+
+def _context(db, user_id, category_ids, now):
+    """Ids and values the cases operate on; now is the end of the seeded date range"""
+    from app.models.budget import Budget
+    from app.models.user import User
+    
+    account = db.get(User, user_id)
+    return {
+        "user_id": user_id,
+        "email": account.email,
+        "username": account.username,
+        "hashed_password": account.hashed_password,
+        "category_ids": category_ids,
+        "expense_id": db.query(Expense.id).filter(Expense.user_id == user_id).order_by(Expense.id).first()[0],
+        "budget_id": db.query(Budget.id).filter(Budget.user_id == user_id).order_by(Budget.id).first()[0],
+        "now": now,
+        "recent": now - timedelta(days=90),
+    }
+
+def time_case(case, ctx, repeat):
+    """Time repeat runs of a case after one warm-up run; returns durations in seconds"""
+    durations = []
+    for attempt in range(repeat + 1):
+        db = SessionLocal()
+        try:
+            prepared = case.prepare(db, ctx) if case.prepare else None
+            started = time.perf_counter()
+            result = case.run(db, ctx, prepared)
+            elapsed = time.perf_counter() - started
+            if case.undo:
+                case.undo(db, ctx, result, prepared) if case.prepare else case.undo(db, ctx, result)
+        finally:
+            db.rollback()
+            db.close()
+        if attempt:
+            durations.append(elapsed)
+    return durations
+
+def run(database_url, sizes, users, repeat, seed_value, only=None):
+    """Seed each size in turn and time every case; returns a results dict"""
+    engine = init_engines(database_url)
+    Base.metadata.create_all(bind=engine)
+    
+    rng = random.Random(seed_value)
+    cases = [case for case in build_cases() if not only or any(case.name.startswith(o) for o in only)]
+    # Fixed, so results from different days seed and query the same data
+    end = datetime.combine(seed.DEFAULT_END_DATE, datetime.min.time())
+    start = end - timedelta(days=730)
+    
+    db = SessionLocal()
+    try:
+        tenants = seed.create_users(db, rng, users, (end - timedelta(days=1)).year, first_index=rng.randrange(10 ** 9))
+    finally:
+        db.close()
+    user_id, category_ids = next(iter(tenants.items()))
+    
+    results = []
+    seeded = 0
+    for size in sorted(sizes):
+        db = SessionLocal()
+        try:
+            seeding_started = time.perf_counter()
+            seed.add_expenses(db, rng, tenants, size - seeded, start, end)
+            print(f"Seeded {size * users} expenses ({size} per user) in "
+                  f"{time.perf_counter() - seeding_started:.1f}s", file=sys.stderr)
+            seeded = size
+            ctx = _context(db, user_id, category_ids, end)
+        finally:
+            db.close()
+        
+        for case in cases:
+            durations = time_case(case, ctx, repeat)
+            results.append({
+                "function": case.name,
+                "size": size,
+                "median_ms": round(statistics.median(durations) * 1000, 3),
+                "min_ms": round(min(durations) * 1000, 3),
+                "max_ms": round(max(durations) * 1000, 3),
+                "runs": len(durations),
+            })
+            print(f"{size:>9} {case.name:<40} {results[-1]['median_ms']:>10.3f} ms", file=sys.stderr)
+    
+    return {
+        "meta": {
+            "database": engine.dialect.name,
+            "users": users,
+            "sizes": sorted(sizes),
+            "repeat": repeat,
+            "seed": seed_value,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(baseline: dict, current: dict, threshold: float, min_delta_ms: float):
+    """Return the (function, size, baseline ms, current ms) entries that slowed down beyond the threshold"""
+    previous = {(r["function"], r["size"]): r["median_ms"] for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get((result["function"], result["size"]))
+        if before is None:
+            continue
+        after = result["median_ms"]
+        if after > before * (1 + threshold) and after - before >= min_delta_ms:
+            regressions.append((result["function"], result["size"], before, after))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Service function benchmarks")
+    parser.add_argument("--database-url", default=None, help="Scratch database; defaults to a temporary SQLite file")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated expenses per user")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per function and size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", default=None, help="Comma-separated name prefixes, e.g. expense.,budget.get")
+    parser.add_argument("--output", default=None, help="Write results JSON here instead of stdout")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown, e.g. 0.2 = 20%%")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+    
+    # Writes go through the sync services directly; no need to start the async engine
+    settings.DB_EXECUTION_MODE = "threadpool"
+    
+    database_url, path = args.database_url, None
+    if database_url is None:
+        handle, path = tempfile.mkstemp(suffix=".db", prefix="service_bench_")
+        os.close(handle)
+        database_url = f"sqlite:///{path}"
+    
+    try:
+        results = run(
+            database_url,
+            [int(size) for size in args.sizes.split(",")],
+            args.users,
+            args.repeat,
+            args.seed,
+            args.only.split(",") if args.only else None,
+        )
+    finally:
+        if path is not None:
+            os.remove(path)
+    
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold, args.min_delta_ms)
+        for function, size, before, after in regressions:
+            print(f"REGRESSION {function} at {size}: {before} ms -> {after} ms "
+                  f"(+{(after / before - 1) * 100:.0f}%)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
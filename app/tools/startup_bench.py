@@ -0,0 +1,120 @@
+"""Measure application cold start: import time and time to first response.
+
+    python -m app.tools.startup_bench [--runs 5] [--target-ms 1500] [--json]
+
+Each run uses a fresh interpreter. The import phase times `import app.main`
+and records whether modules meant to load lazily were imported anyway. The
+serve phase starts uvicorn and polls --path until it answers, timing from
+process launch to the first successful response. Exits non-zero when the
+median time to first response exceeds --target-ms.
+
+The server uses the environment as is (DATABASE_URL etc.); startup itself
+does not connect to the database, so it need not be reachable for "/".
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+# Modules that must not be imported just by loading the app
+LAZY_MODULES = ["passlib", "jose", "alembic", "httpx"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def measure_import():
+    """Import app.main in a fresh interpreter; returns (seconds, eagerly loaded lazy modules)"""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT], check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["seconds"], result["loaded"]
+
+def measure_first_response(path: str, timeout: float = 30) -> float:
+    """Start uvicorn and return the seconds from launch until path answers"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status < 500:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise RuntimeError(f"No response from {url} within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def run(runs: int, path: str):
+    """Run the benchmark and return a results dict"""
+    import_times, loaded, first_response_times = [], set(), []
+    for _ in range(runs):
+        seconds, eager = measure_import()
+        import_times.append(seconds)
+        loaded.update(eager)
+        first_response_times.append(measure_first_response(path))
+    
+    return {
+        "runs": runs,
+        "import_ms": {
+            "median": round(statistics.median(import_times) * 1000, 1),
+            "max": round(max(import_times) * 1000, 1),
+        },
+        "first_response_ms": {
+            "median": round(statistics.median(first_response_times) * 1000, 1),
+            "max": round(max(first_response_times) * 1000, 1),
+        },
+        "eagerly_loaded": sorted(loaded),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Application cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/", help="Path polled for the first response")
+    parser.add_argument("--target-ms", type=float, default=1500,
+                        help="Fail if the median time to first response is above this")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    
+    # Run from the project root so `app` is importable in the child processes
+    os.chdir(os.path.join(os.path.dirname(__file__), "..", ".."))
+    results = run(args.runs, args.path)
+    results["target_ms"] = args.target_ms
+    results["passed"] = results["first_response_ms"]["median"] <= args.target_ms
+    
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"Import app.main: median {results['import_ms']['median']} ms, max {results['import_ms']['max']} ms")
+        print(f"First response: median {results['first_response_ms']['median']} ms, "
+              f"max {results['first_response_ms']['max']} ms (target {args.target_ms} ms)")
+        if results["eagerly_loaded"]:
+            print(f"Loaded at import but meant to be lazy: {', '.join(results['eagerly_loaded'])}")
+    
+    sys.exit(0 if results["passed"] else 1)
+
+if __name__ == "__main__":
+    main()
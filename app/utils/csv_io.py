@@ -0,0 +1,110 @@
+import codecs
+import csv
+import io
+import json
+import re
+from datetime import date, datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Optional, Sequence, Union
+
+# A line with its ending; only the endings csv recognises, unlike str.splitlines,
+# which also splits on form feeds, \x1c-\x1e, \x85 and Unicode separators
+LINE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)")
+
+def _split_lines(text: str):
+    """Split text into complete lines and the incomplete rest"""
+    lines = LINE.findall(text)
+    return lines, text[sum(len(line) for line in lines):]
+
+async def _iter_lines(chunks: AsyncIterable[bytes], encoding: str) -> AsyncIterator[str]:
+    """Split a stream of byte chunks into text lines, keeping line endings"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        # A trailing \r may be the first half of a \r\n split across chunks
+        held = "\r" if pending.endswith("\r") else ""
+        lines, pending = _split_lines(pending[:len(pending) - len(held)])
+        pending += held
+        for line in lines:
+            yield line
+    lines, pending = _split_lines(pending + decoder.decode(b"", final=True))
+    for line in lines:
+        yield line
+    if pending:
+        yield pending
+
+class CsvRowError:
+    """Stands in for a row that could not be parsed, so it is reported instead of dropped"""
+
+    def __init__(self, message: str):
+        self.message = message
+
+def _in_quoted_field(line: str, in_quotes: bool) -> bool:
+    """Whether a quoted field is still open at the end of line, by the csv module's rules
+
+    A quote only opens a field at its start; elsewhere it is a literal
+    character. Inside a quoted field "" is an escaped quote.
+    """
+    if not in_quotes and '"' not in line:
+        return False
+    field_start = not in_quotes
+    index = 0
+    while index < len(line):
+        char = line[index]
+        if in_quotes:
+            if char == '"':
+                if line.startswith('"', index + 1):
+                    index += 1
+                else:
+                    in_quotes = False
+        elif char == '"' and field_start:
+            in_quotes = True
+        field_start = not in_quotes and char == ","
+        index += 1
+    return in_quotes
+
+async def read_csv_records(chunks: AsyncIterable[bytes], encoding: str = "utf-8-sig") -> AsyncIterator[Union[Dict[str, Optional[str]], CsvRowError]]:
+    """Parse a streamed CSV body with a header row into dicts
+
+    Empty fields become None so optional fields validate as missing. A
+    quoted field left open at the end of the body yields a CsvRowError.
+    """
+    header = None
+    buffer = []
+    in_quotes = False
+    async for line in _iter_lines(chunks, encoding):
+        # A quoted field may span lines; wait until its closing quote arrives
+        buffer.append(line)
+        in_quotes = _in_quoted_field(line, in_quotes)
+        if in_quotes:
+            continue
+        rows = list(csv.reader(buffer))
+        buffer = []
+        for row in rows:
+            if not row:
+                continue
+            if header is None:
+                header = [name.strip() for name in row]
+                continue
+            yield {name: (value if value != "" else None) for name, value in zip(header, row)}
+    
+    if buffer:
+        yield CsvRowError("Unterminated quoted field")
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def format_csv(rows: Sequence[Sequence[Any]]) -> str:
+    """Render rows as CSV text; None becomes an empty field"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([[_export_value(value) for value in row] for row in rows])
+    return buffer.getvalue()
+
+def format_ndjson(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> str:
+    """Render rows as newline-delimited JSON objects keyed by column"""
+    return "".join(
+        json.dumps({column: _export_value(value) for column, value in zip(columns, row)}) + "\n"
+        for row in rows
+    )
@@ -0,0 +1,53 @@
+import hashlib
+from datetime import date
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.schemas.user import User
+from app.services.user import get_data_version
+from app.utils.security import get_current_user
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+async def user_data_etag(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> int:
+    """Dependency adding an ETag derived from the user's data version
+
+    The tag covers the user, their data version, the path, the query
+    parameters and today's date (for endpoints relative to now), so it is
+    computed without running or serializing the actual query. Answers 304
+    when If-None-Match matches; otherwise returns the data version.
+    """
+    version = await db.run_sync(get_data_version, current_user.id)
+    
+    fingerprint = "|".join([
+        str(current_user.id),
+        str(version),
+        request.url.path,
+        "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items())),
+        date.today().isoformat(),
+    ])
+    etag = f'W/"{hashlib.sha1(fingerprint.encode()).hexdigest()[:20]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+    return version
@@ -0,0 +1,44 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+
+from app.utils.periods import naive_utc
+
+# Response header carrying the opaque cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> List[Any]:
+    """Decode a cursor produced by encode_cursor back into typed sort key values
+
+    Datetimes come back as naive UTC, like every other datetime a request sends.
+    """
+    invalid_cursor = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise invalid_cursor
+        return [
+            naive_utc(datetime.fromisoformat(value)) if type_ is datetime else type_(value)
+            for value, type_ in zip(payload, types)
+        ]
+    except (ValueError, TypeError):
+        raise invalid_cursor
+
+def next_cursor(items: Sequence[Any], limit: int, key: Callable[[Any], Sequence[Any]]) -> Optional[str]:
+    """Return the cursor for the page after items, or None if this was the last page"""
+    if not items or len(items) < limit:
+        return None
+    return encode_cursor(key(items[-1]))
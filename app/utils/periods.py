@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+# Supported time series granularities, matching PostgreSQL date_trunc fields
+GRANULARITIES = ("day", "week", "month", "year")
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC, as expense dates are stored; naive values pass through"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+class UTCDateTime(datetime):
+    """Pydantic field type parsed like datetime, with aware values converted to naive UTC
+
+    Used for every datetime a request sends, in bodies and query strings, so
+    that writes and filters agree and drivers never see aware values for the
+    timezone-less columns (asyncpg rejects them).
+    """
+
+    @classmethod
+    def __get_validators__(cls):
+        from pydantic.datetime_parse import parse_datetime
+        yield parse_datetime
+        yield naive_utc
+
+def truncate(value: datetime, granularity: str) -> datetime:
+    """Start of the calendar period containing value (weeks start on Monday)"""
+    start = datetime(value.year, value.month, value.day)
+    if granularity == "week":
+        return start - timedelta(days=start.weekday())
+    if granularity == "month":
+        return start.replace(day=1)
+    if granularity == "year":
+        return start.replace(month=1, day=1)
+    return start
+
+def shift(start: datetime, granularity: str, periods: int = 1) -> datetime:
+    """Move a period start forward (or backward, if negative) by whole periods"""
+    if granularity == "day":
+        return start + timedelta(days=periods)
+    if granularity == "week":
+        return start + timedelta(weeks=periods)
+    if granularity == "month":
+        month_index = start.year * 12 + start.month - 1 + periods
+        return start.replace(year=month_index // 12, month=month_index % 12 + 1)
+    return start.replace(year=start.year + periods)
+
+def label(start: datetime, granularity: str) -> str:
+    """Period label, e.g. "2023-04-05", "2023-W14", "2023-04" or "2023\""""
+    if granularity == "day":
+        return start.strftime("%Y-%m-%d")
+    if granularity == "week":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == "month":
+        return start.strftime("%Y-%m")
+    return str(start.year)
@@ -1,53 +1,69 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.passwords import PasswordHasher, get_context
+from app.core.profiling import profile_phase
 from app.database import get_db
 from app.models.user import User
-from app.schemas.user import TokenData
-import os
-from dotenv import load_dotenv
+from app.schemas.user import TokenData, User as UserSchema
 
-# JWT Configuration
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = "HS256"
+# JWT Configuration; the key and algorithm come from settings, which also read .env
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing; request handlers use password_hasher to keep bcrypt off the event loop
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    rounds=settings.BCRYPT_ROUNDS,
+)
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Active users by ID, so authenticated requests usually skip the users table.
+# Invalidated by the user service on update/deactivation; the TTL bounds
+# staleness across worker processes.
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
 def verify_password(plain_password, hashed_password):
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_context(settings.BCRYPT_ROUNDS).verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     """Hash a password"""
-    return pwd_context.hash(password)
+    return get_context(settings.BCRYPT_ROUNDS).hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
+    # jose is imported on first use to keep startup fast
+    from jose import jwt
+    
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     """Get the current authenticated user from JWT token"""
+    with profile_phase("auth"):
+        return await _authenticate(token, db)
+
+async def _authenticate(token: str, db: AsyncSession):
+    from jose import JWTError, jwt
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
         user_id: int = payload.get("id")
         if email is None or user_id is None:
@@ -56,9 +72,16 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    cached_user = user_cache.get(token_data.user_id)
+    if cached_user is not None:
+        return cached_user
+    
+    user = await db.get(User, token_data.user_id)
     if user is None:
         raise credentials_exception
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return user
\ No newline at end of file
+    
+    current_user = UserSchema.from_orm(user)
+    user_cache.set(current_user.id, current_user)
+    return current_user
\ No newline at end of file
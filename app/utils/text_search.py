@@ -0,0 +1,61 @@
+import re
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+WORD = re.compile(r"\w+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase words"""
+    return WORD.findall(text.lower()) if text else []
+
+def rank(query: str, text: str) -> float:
+    """Score text against a search query the way the PostgreSQL search matches
+
+    Every query word must equal or prefix a word of the text; failing that,
+    the whole query may appear as a substring. Returns 0.0 for no match.
+    """
+    words = tokenize(text)
+    terms = tokenize(query)
+    if not words or not terms:
+        return 0.0
+    
+    score = 0.0
+    for term in terms:
+        if term in words:
+            score += words.count(term)
+        elif any(word.startswith(term) for word in words):
+            score += 0.5
+        else:
+            score = 0.0
+            break
+    
+    if not score and query.lower() in text.lower():
+        score = 0.1
+    
+    # Favour short texts where the terms make up more of the content
+    return round(score / len(words), 6)
+
+class InvertedIndex:
+    """Word postings over a set of texts, for finding rank() candidates without a scan
+
+    Every query word of a text rank() scores above zero lies within one of
+    the text's words, so candidates() is a superset of the matches.
+    """
+
+    def __init__(self, documents: Iterable[Tuple[Hashable, str]]):
+        self.postings: Dict[str, Set[Hashable]] = {}
+        for key, text in documents:
+            for word in tokenize(text):
+                self.postings.setdefault(word, set()).add(key)
+
+    def candidates(self, query: str) -> Set[Hashable]:
+        """Keys of the texts containing every query word within one of their words"""
+        matches = None
+        for term in set(tokenize(query)):
+            keys = set()
+            for word, postings in self.postings.items():
+                if term in word:
+                    keys |= postings
+            matches = keys if matches is None else matches & keys
+            if not matches:
+                break
+        return matches or set()
@@ -15,6 +15,7 @@ from app.models.user import User
 from app.models.category import Category
 from app.models.expense import Expense
 from app.models.budget import Budget
+from app.models.expense_rollup import ExpenseDailyRollup
 from app.database import Base
 
 # Set target_metadata to Base.metadata
@@ -0,0 +1,46 @@
+"""Add expense daily rollups
+
+Revision ID: 0de22094347a
+Revises: e05a2f668ce5
+Create Date: 2026-10-18 10:03:27.118460
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0de22094347a'
+down_revision: Union[str, None] = 'e05a2f668ce5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('expense_daily_rollups',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('min_amount', sa.Float(), nullable=True),
+    sa.Column('max_amount', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'category_id', 'day')
+    )
+    # Backfill from existing expenses
+    op.execute(
+        "INSERT INTO expense_daily_rollups "
+        "(user_id, category_id, day, total, count, min_amount, max_amount) "
+        "SELECT user_id, category_id, date(date), SUM(amount), COUNT(id), MIN(amount), MAX(amount) "
+        "FROM expenses GROUP BY user_id, category_id, date(date)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('expense_daily_rollups')
@@ -0,0 +1,113 @@
+"""Partition expenses by month
+
+Revision ID: 6040b5936ed8
+Revises: f40fb79b936f
+Create Date: 2026-10-18 17:24:51.930145
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6040b5936ed8'
+down_revision: Union[str, None] = 'f40fb79b936f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months past the current one that get a partition up front; app.tools.partitions
+# keeps creating them from then on
+PARTITIONS_AHEAD = 3
+
+SEARCH_TEXT = "coalesce(description, '') || ' ' || coalesce(note, '')"
+
+COLUMNS = "id, amount, description, date, note, payment_method, user_id, category_id, created_at, updated_at"
+
+TABLE = """
+    CREATE TABLE expenses (
+        id integer NOT NULL DEFAULT nextval('expenses_id_seq'),
+        amount double precision NOT NULL,
+        description varchar,
+        date timestamp without time zone NOT NULL,
+        note text,
+        payment_method varchar,
+        user_id integer NOT NULL REFERENCES users (id),
+        category_id integer NOT NULL REFERENCES categories (id),
+        created_at timestamp with time zone DEFAULT now(),
+        updated_at timestamp with time zone,
+        search_vector tsvector GENERATED ALWAYS AS (to_tsvector('english', {search_text})) STORED,
+        PRIMARY KEY ({primary_key})
+    ) {partition_by}
+"""
+
+INDEXES = [
+    "CREATE INDEX ix_expenses_id ON expenses (id)",
+    "CREATE INDEX ix_expenses_user_id_date ON expenses (user_id, date) INCLUDE (amount, category_id)",
+    "CREATE INDEX ix_expenses_user_id_category_id_date ON expenses (user_id, category_id, date) INCLUDE (amount)",
+    "CREATE INDEX ix_expenses_search_vector ON expenses USING gin (search_vector)",
+    f"CREATE INDEX ix_expenses_search_text_trgm ON expenses USING gin (({SEARCH_TEXT}) gin_trgm_ops)",
+]
+
+
+def _shift_month(month: datetime, months: int) -> datetime:
+    month_index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=month_index // 12, month=month_index % 12 + 1)
+
+
+def _replace_table(old_name: str, primary_key: str, partition_by: str) -> None:
+    """Move expenses to a new table definition, keeping ids and the id sequence"""
+    op.execute(f"ALTER TABLE expenses RENAME TO {old_name}")
+    op.execute(f"ALTER TABLE {old_name} RENAME CONSTRAINT expenses_pkey TO {old_name}_pkey")
+    op.execute("ALTER SEQUENCE expenses_id_seq OWNED BY NONE")
+    op.execute(TABLE.format(search_text=SEARCH_TEXT, primary_key=primary_key, partition_by=partition_by))
+    op.execute("ALTER SEQUENCE expenses_id_seq OWNED BY expenses.id")
+
+
+def _copy_rows(old_name: str) -> None:
+    op.execute(f"INSERT INTO expenses ({COLUMNS}) SELECT {COLUMNS} FROM {old_name}")
+    op.execute(f"DROP TABLE {old_name}")
+    # Index after loading; the names are free again once the old table is gone
+    for statement in INDEXES:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Partitioning is PostgreSQL only
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    
+    # The partition key must be part of the primary key
+    _replace_table('expenses_unpartitioned', 'id, date', 'PARTITION BY RANGE (date)')
+    
+    # One partition per month from the oldest expense through PARTITIONS_AHEAD
+    # months from now; anything outside those lands in the default partition
+    oldest = bind.execute(sa.text("SELECT min(date) FROM expenses_unpartitioned")).scalar()
+    now = datetime.now()
+    month = datetime(now.year, now.month, 1)
+    if oldest is not None and oldest < month:
+        month = datetime(oldest.year, oldest.month, 1)
+    last = _shift_month(datetime(now.year, now.month, 1), PARTITIONS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE expenses_{month:%Y_%m} PARTITION OF expenses "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_shift_month(month, 1):%Y-%m-%d}')"
+        )
+        month = _shift_month(month, 1)
+    op.execute("CREATE TABLE expenses_default PARTITION OF expenses DEFAULT")
+    
+    _copy_rows('expenses_unpartitioned')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    # Dropping the partitioned table drops its partitions too
+    _replace_table('expenses_partitioned', 'id', '')
+    _copy_rows('expenses_partitioned')
@@ -0,0 +1,28 @@
+"""Add user data version
+
+Revision ID: 9d54a4c81c62
+Revises: 0de22094347a
+Create Date: 2026-10-18 13:41:05.270914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d54a4c81c62'
+down_revision: Union[str, None] = '0de22094347a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'data_version')
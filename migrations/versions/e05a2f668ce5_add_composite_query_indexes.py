@@ -0,0 +1,48 @@
+"""Add composite query indexes
+
+Revision ID: e05a2f668ce5
+Revises: ff6ed2bcaf03
+Create Date: 2026-10-18 09:12:41.503217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e05a2f668ce5'
+down_revision: Union[str, None] = 'ff6ed2bcaf03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Expense listing and analytics filter on user + date range (optionally
+    # category); amount/category_id are INCLUDEd so aggregates are index-only.
+    op.create_index(
+        'ix_expenses_user_id_date', 'expenses', ['user_id', 'date'],
+        unique=False, postgresql_include=['amount', 'category_id']
+    )
+    op.create_index(
+        'ix_expenses_user_id_category_id_date', 'expenses', ['user_id', 'category_id', 'date'],
+        unique=False, postgresql_include=['amount']
+    )
+    op.create_index(
+        'ix_budgets_user_id_is_active_start_date', 'budgets', ['user_id', 'is_active', 'start_date'],
+        unique=False
+    )
+    op.create_index(
+        'ix_categories_user_id_name', 'categories', ['user_id', 'name'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_categories_user_id_name', table_name='categories')
+    op.drop_index('ix_budgets_user_id_is_active_start_date', table_name='budgets')
+    op.drop_index('ix_expenses_user_id_category_id_date', table_name='expenses')
+    op.drop_index('ix_expenses_user_id_date', table_name='expenses')
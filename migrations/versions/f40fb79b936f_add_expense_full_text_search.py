@@ -0,0 +1,43 @@
+"""Add expense full-text search
+
+Revision ID: f40fb79b936f
+Revises: 9d54a4c81c62
+Create Date: 2026-10-18 16:02:37.418326
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f40fb79b936f'
+down_revision: Union[str, None] = '9d54a4c81c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_TEXT = "coalesce(description, '') || ' ' || coalesce(note, '')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Search is PostgreSQL only; other databases use the application's fallback
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "ALTER TABLE expenses ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+        f"(to_tsvector('english', {SEARCH_TEXT})) STORED"
+    )
+    op.execute("CREATE INDEX ix_expenses_search_vector ON expenses USING gin (search_vector)")
+    op.execute(f"CREATE INDEX ix_expenses_search_text_trgm ON expenses USING gin (({SEARCH_TEXT}) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_expenses_search_text_trgm', table_name='expenses')
+    op.drop_index('ix_expenses_search_vector', table_name='expenses')
+    op.drop_column('expenses', 'search_vector')
@@ -0,0 +1,96 @@
+import asyncio
+import os
+from contextlib import contextmanager
+
+# Read when app.config is imported
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import database
+from app.config import settings
+from app.models.category import Category
+from app.models.user import User
+from app.services.analytics_cache import analytics_cache
+from app.services.expense import search_index_cache
+from app.tools.bootstrap import create_all
+from app.utils.security import create_access_token, user_cache
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: seeds large amounts of data")
+
+@pytest.fixture
+def execution_mode():
+    """DB_EXECUTION_MODE for the test; parametrize it to run in both modes"""
+    return "async"
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch, execution_mode):
+    """Sync engine of a fresh SQLite database with all tables created"""
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(settings, "DB_EXECUTION_MODE", execution_mode)
+    # User ids restart in every database, so nothing may be served from earlier tests
+    user_cache.clear()
+    analytics_cache.backend.clear()
+    search_index_cache.clear()
+
+    create_all()
+    yield database.engine
+    asyncio.run(database.dispose_engines())
+
+@pytest.fixture
+def db(engine):
+    session = database.SessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture
+def user(db):
+    user = User(email="user@example.com", username="user", hashed_password="unused")
+    db.add(user)
+    db.commit()
+    return user
+
+@pytest.fixture
+def category(db, user):
+    category = Category(name="Groceries", user_id=user.id)
+    db.add(category)
+    db.commit()
+    return category
+
+@pytest.fixture
+def client(engine):
+    from app.main import create_app
+
+    with TestClient(create_app()) as client:
+        yield client
+
+@pytest.fixture
+def auth_headers(user):
+    token = create_access_token({"sub": user.email, "id": user.id})
+    return {"Authorization": f"Bearer {token}"}
+
+@contextmanager
+def count_statements(engine):
+    """Collect the SQL statements executed on an engine inside the block
+
+    Commits are recorded as "COMMIT", since drivers do not send them as statements.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def commit(conn):
+        statements.append("COMMIT")
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "commit", commit)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        event.remove(engine, "commit", commit)
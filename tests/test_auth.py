@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOGIN_SCRIPT = """
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.tools.bootstrap import create_all
+
+create_all()
+with TestClient(create_app()) as client:
+    client.post("/api/users/register", json={
+        "email": "user@example.com", "username": "user", "password": "password123"
+    }).raise_for_status()
+    response = client.post("/api/token", data={"username": "user@example.com", "password": "password123"})
+    print(response.status_code)
+    token = response.json()["access_token"]
+    print(client.get("/api/users/me", headers={"Authorization": f"Bearer {token}"}).status_code)
+"""
+
+def test_secret_key_from_env_file_signs_tokens(tmp_path):
+    (tmp_path / ".env").write_text(
+        f"SECRET_KEY=from-env-file\nDATABASE_URL=sqlite:///{tmp_path / 'test.db'}\nBCRYPT_ROUNDS=4\n"
+    )
+    env = {name: value for name, value in os.environ.items() if name not in ("SECRET_KEY", "DATABASE_URL")}
+    
+    result = subprocess.run(
+        [sys.executable, "-c", LOGIN_SCRIPT], cwd=tmp_path, env={**env, "PYTHONPATH": ROOT},
+        capture_output=True, text=True
+    )
+    
+    assert result.stdout.split() == ["200", "200"], result.stderr
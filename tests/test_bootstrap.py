@@ -0,0 +1,15 @@
+import pytest
+
+from app.config import settings
+from app.tools import bootstrap
+
+@pytest.mark.parametrize("argv", [["bootstrap"], ["bootstrap", "--create-all"]])
+def test_missing_database_url_is_a_usage_error(monkeypatch, capsys, argv):
+    monkeypatch.setattr(settings, "DATABASE_URL", None)
+    monkeypatch.setattr("sys.argv", argv)
+    
+    with pytest.raises(SystemExit) as exit_info:
+        bootstrap.main()
+    
+    assert exit_info.value.code == 2
+    assert "DATABASE_URL is not set" in capsys.readouterr().err
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.budget import Budget
+from app.models.expense import Expense
+from app.services.budget import get_all_budget_progress
+from tests.conftest import count_statements
+
+def add_budgets(db, user, category, count):
+    for index in range(count):
+        db.add(Budget(
+            name=f"Budget {index}", amount=100, user_id=user.id,
+            category_id=category.id if index % 2 else None,
+            start_date=datetime(2024, 1, 1), end_date=datetime(2024, 12, 31)
+        ))
+    db.add(Expense(amount=30, date=datetime(2024, 3, 1), user_id=user.id, category_id=category.id))
+    db.commit()
+
+@pytest.mark.parametrize("count", [1, 10])
+def test_all_budget_progress_is_one_statement(engine, db, user, category, count):
+    add_budgets(db, user, category, count)
+    user_id = user.id
+    db.expire_all()
+    
+    with count_statements(engine) as statements:
+        progress = get_all_budget_progress(db, user_id)
+    
+    assert len(progress) == count
+    assert all(budget.spent_amount == 30 for budget in progress)
+    assert len(statements) == 1
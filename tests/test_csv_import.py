@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.utils.csv_io import CsvRowError, read_csv_records
+
+def parse(body: str, chunk_size: int = 7):
+    async def chunks():
+        data = body.encode()
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+    
+    async def collect():
+        return [record async for record in read_csv_records(chunks())]
+    
+    return asyncio.run(collect())
+
+def test_multiline_quoted_fields():
+    records = parse('amount,note\n1,"two\nlines"\n2,"say ""hi"""\n')
+    
+    assert records == [{"amount": "1", "note": "two\nlines"}, {"amount": "2", "note": 'say "hi"'}]
+
+def test_stray_quote_in_unquoted_field_is_literal():
+    records = parse('amount,description\n1,he said "hi\n2,later\n3,last')
+    
+    assert records == [
+        {"amount": "1", "description": 'he said "hi'},
+        {"amount": "2", "description": "later"},
+        {"amount": "3", "description": "last"},
+    ]
+
+@pytest.mark.parametrize("separator", ["\x0b", "\x0c", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029"])
+def test_only_newlines_end_rows(separator):
+    records = parse(f"amount,description\n1,lunch{separator}with bob\n2,dinner\n")
+    
+    assert records == [{"amount": "1", "description": f"lunch{separator}with bob"},
+                       {"amount": "2", "description": "dinner"}]
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 1000])
+def test_line_endings_split_across_chunks(chunk_size):
+    records = parse('amount,note\r\n1,"a\r\nb"\r2,c\n3,d', chunk_size)
+    
+    assert records == [{"amount": "1", "note": "a\r\nb"}, {"amount": "2", "note": "c"}, {"amount": "3", "note": "d"}]
+
+def test_unterminated_quoted_field_is_reported():
+    records = parse('amount,description\n1,ok\n2,"never closed\n3,more\n')
+    
+    assert records[0] == {"amount": "1", "description": "ok"}
+    assert len(records) == 2 and isinstance(records[1], CsvRowError)
+
+def test_bulk_import_reports_unparseable_rows(client, auth_headers, category):
+    body = (
+        "amount,date,category_id,description\n"
+        f'10,2024-01-01T00:00:00,{category.id},he said "hi\n'
+        f"20,2024-01-02T00:00:00,{category.id},fine\n"
+        f'30,2024-01-03T00:00:00,{category.id},"unterminated\n'
+        f"40,2024-01-04T00:00:00,{category.id},swallowed\n"
+    )
+    
+    response = client.post("/api/expenses/bulk", content=body,
+                           headers={**auth_headers, "Content-Type": "text/csv"})
+    
+    assert response.status_code == 200
+    assert response.json() == {"inserted": 2, "errors": [{"row": 3, "errors": ["Unterminated quoted field"]}]}
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.category import Category
+
+@pytest.mark.parametrize("execution_mode", ["async", "threadpool"])
+def test_dashboard_matches_the_separate_endpoints(client, auth_headers, db, user, category):
+    other = Category(name="Rent", user_id=user.id)
+    db.add(other)
+    db.commit()
+    
+    now = datetime.now().replace(microsecond=0)
+    for days_ago, amount, category_id in [(0, 10, category.id), (1, 25, other.id), (40, 5, category.id),
+                                          (70, 500, other.id), (800, 99, category.id)]:
+        response = client.post("/api/expenses/", headers=auth_headers, json={
+            "amount": amount, "date": (now - timedelta(days=days_ago)).isoformat(), "category_id": category_id
+        })
+        assert response.status_code == 201
+    
+    response = client.get("/api/dashboard/", headers=auth_headers, params={"months": 6})
+    assert response.status_code == 200, response.text
+    dashboard = response.json()
+    
+    monthly = client.get("/api/expenses/monthly", headers=auth_headers, params={"months": 6}).json()
+    start_date = datetime.strptime(monthly[0]["period"], "%Y-%m").isoformat()
+    params = {"start_date": start_date, "end_date": datetime.now().isoformat()}
+    assert dashboard["monthly"] == monthly
+    assert dashboard["summary"] == client.get("/api/expenses/summary", headers=auth_headers, params=params).json()
+    assert dashboard["by_category"] == client.get(
+        "/api/expenses/by-category", headers=auth_headers, params=params
+    ).json()
+    assert [row["category_name"] for row in dashboard["by_category"]] == ["Rent", "Groceries"]
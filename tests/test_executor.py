@@ -0,0 +1,29 @@
+import asyncio
+import threading
+
+from app.core.executor import BoundedExecutor
+
+def test_cancelled_queued_call_leaves_the_queue():
+    executor = BoundedExecutor(1, name="test")
+    release = threading.Event()
+    
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: "never"))
+        await asyncio.sleep(0.05)
+        assert (executor.stats()["active"], executor.stats()["queue_depth"]) == (1, 1)
+        
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        assert executor.stats()["queue_depth"] == 0
+        
+        release.set()
+        assert await running is True
+    
+    try:
+        asyncio.run(scenario())
+        stats = executor.stats()
+        assert (stats["active"], stats["queue_depth"], stats["completed"]) == (0, 0, 1)
+    finally:
+        release.set()
+        executor.shutdown()
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pytest
+
+from app.schemas.expense import ExpenseCreate
+from app.services.expense import create_expense
+
+from tests.conftest import count_statements
+
+def post_expense(client, auth_headers, category, amount=10):
+    response = client.post("/api/expenses/", headers=auth_headers, json={
+        "amount": amount, "date": "2024-01-01T12:00:00", "category_id": category.id
+    })
+    assert response.status_code == 201
+    return response.json()
+
+@pytest.mark.parametrize("field", ["amount", "date", "category_id"])
+def test_bulk_update_rejects_null_required_fields(client, auth_headers, category, field):
+    expense = post_expense(client, auth_headers, category)
+    
+    response = client.patch("/api/expenses/bulk", headers=auth_headers, json={
+        "ids": [expense["id"]], "changes": {field: None}
+    })
+    
+    assert response.status_code == 400
+    assert response.json() == {"detail": f"{field} cannot be null"}
+
+def test_bulk_update_checks_category_zero(client, auth_headers, category):
+    expense = post_expense(client, auth_headers, category)
+    
+    response = client.patch("/api/expenses/bulk", headers=auth_headers, json={
+        "ids": [expense["id"]], "changes": {"category_id": 0}
+    })
+    
+    assert response.status_code == 404
+    assert client.get(f"/api/expenses/{expense['id']}", headers=auth_headers).json()["category_id"] == category.id
+
+@pytest.mark.parametrize("field", ["amount", "date", "category_id"])
+def test_update_rejects_null_required_fields(client, auth_headers, category, field):
+    expense = post_expense(client, auth_headers, category)
+    
+    response = client.put(f"/api/expenses/{expense['id']}", headers=auth_headers, json={field: None})
+    
+    assert response.status_code == 400
+    assert response.json() == {"detail": f"{field} cannot be null"}
+
+def test_update_checks_category_zero(client, auth_headers, category):
+    expense = post_expense(client, auth_headers, category)
+    
+    response = client.put(f"/api/expenses/{expense['id']}", headers=auth_headers, json={"category_id": 0})
+    
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Category not found"}
+
+def test_create_is_insert_rollup_upsert_and_version_bump_in_one_commit(engine, db, user, category):
+    user_id, category_id = user.id, category.id
+    db.expire_all()
+    
+    with count_statements(engine) as statements:
+        expense = create_expense(db, ExpenseCreate(
+            amount=10, date=datetime(2024, 1, 1, 12), category_id=category_id
+        ), user_id)
+    
+    assert len(statements) == 4, statements
+    insert, rollup, version, commit = statements
+    assert insert.startswith("INSERT INTO expenses ") and "RETURNING" in insert
+    assert rollup.startswith("INSERT INTO expense_daily_rollups ") and "ON CONFLICT" in rollup
+    assert version.startswith("UPDATE users SET data_version=")
+    assert commit == "COMMIT"
+    assert expense.amount == 10
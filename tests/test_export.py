@@ -0,0 +1,104 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.config import settings
+from app.models.expense import Expense
+from app.utils.security import create_access_token
+
+EXPORT_ROWS = 1000000
+# Rows inserted per statement while seeding
+SEED_CHUNK = 100000
+# Allowed peak RSS growth while streaming; materializing the rows would need several times this
+RSS_BUDGET_MB = 25
+
+# Runs the export in a fresh interpreter so the seeding above does not count
+# towards its peak RSS; the body is consumed chunk by chunk and discarded
+EXPORT_SCRIPT = """
+import asyncio, json, sys
+from app import database
+from app.main import create_app
+
+def rss_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+
+def reset_peak_rss():
+    # Restart the VmHWM high-water mark from the current RSS
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+
+async def export(app, query):
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "root_path": "",
+        "path": "/api/expenses/export", "raw_path": b"/api/expenses/export", "query_string": query,
+        "headers": [(b"authorization", sys.argv[1].encode()), (b"host", b"test")],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+    received = {"status": None, "bytes": 0, "lines": 0}
+    requested = asyncio.Event()
+    async def receive():
+        # The request body once, then block like a client that stays connected
+        if requested.is_set():
+            await asyncio.Event().wait()
+        requested.set()
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        if message["type"] == "http.response.start":
+            received["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            received["bytes"] += len(message.get("body", b""))
+            received["lines"] += message.get("body", b"").count(b"\\n")
+    await app(scope, receive, send)
+    return received
+
+async def main():
+    database.init_engines()
+    app = create_app()
+    await export(app, b"category_id=-1")  # Warm up imports and connections
+    reset_peak_rss()
+    before = rss_mb("VmRSS")
+    received = await export(app, b"format=csv")
+    print(json.dumps({**received, "rss_growth_mb": rss_mb("VmHWM") - before}))
+    await database.dispose_engines()
+
+asyncio.run(main())
+"""
+
+@pytest.mark.slow
+@pytest.mark.skipif(not os.path.exists("/proc/self/clear_refs"), reason="Peak RSS is read from Linux procfs")
+@pytest.mark.parametrize("execution_mode", ["async", "threadpool"])
+def test_export_streams_within_rss_budget(engine, db, user, category, execution_mode):
+    start = datetime(2020, 1, 1)
+    for first in range(0, EXPORT_ROWS, SEED_CHUNK):
+        db.execute(insert(Expense), [
+            {"amount": 1 + i % 100, "date": start + timedelta(minutes=i), "description": f"Expense number {i}",
+             "note": "A note long enough to make each exported row a realistic size", "payment_method": "card",
+             "user_id": user.id, "category_id": category.id}
+            for i in range(first, first + SEED_CHUNK)
+        ])
+    db.commit()
+    
+    token = create_access_token({"sub": user.email, "id": user.id})
+    env = {
+        **os.environ,
+        "DATABASE_URL": settings.DATABASE_URL,
+        "DB_EXECUTION_MODE": execution_mode,
+        "PYTHONPATH": os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", EXPORT_SCRIPT, f"Bearer {token}"],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output)
+    
+    assert result["status"] == 200
+    assert result["lines"] == EXPORT_ROWS + 1  # Header row
+    assert result["rss_growth_mb"] < RSS_BUDGET_MB, result
@@ -0,0 +1,148 @@
+import importlib.util
+import os
+from datetime import datetime
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import event, inspect
+
+from app.database import Base
+from app.models.budget import Budget
+from app.models.expense import Expense
+from app.services.budget import get_all_budget_progress, get_budget_progress
+from app.services.expense import (
+    get_expense_summary, get_expenses, get_expenses_by_category, get_monthly_expenses
+)
+from app.services.rollup import rebuild_daily_rollups
+
+MIGRATION = os.path.join(os.path.dirname(__file__), "..", "migrations", "versions",
+                         "e05a2f668ce5_add_composite_query_indexes.py")
+INDEXES = {
+    "ix_expenses_user_id_date": ("expenses", ["user_id", "date"]),
+    "ix_expenses_user_id_category_id_date": ("expenses", ["user_id", "category_id", "date"]),
+    "ix_budgets_user_id_is_active_start_date": ("budgets", ["user_id", "is_active", "start_date"]),
+    "ix_categories_user_id_name": ("categories", ["user_id", "name"]),
+}
+# Partial-day bounds, so aggregates read the rollup and the raw expenses at the edges
+START, END = datetime(2024, 1, 10, 12), datetime(2024, 3, 20, 12)
+
+@pytest.fixture
+def data(db, user, category):
+    for day in range(1, 29):
+        for month in range(1, 5):
+            db.add(Expense(amount=day, date=datetime(2024, month, day, 12), user_id=user.id, category_id=category.id))
+    db.add(Budget(amount=100, name="Overall", start_date=START, end_date=END, is_active=True, user_id=user.id))
+    db.add(Budget(amount=50, name="Groceries", start_date=START, end_date=END, is_active=True,
+                  user_id=user.id, category_id=category.id))
+    db.commit()
+    rebuild_daily_rollups(db, user.id)
+    return user.id, category.id
+
+def executed_plans(engine, db, call):
+    """EXPLAIN QUERY PLAN of every SELECT the call executes, with its parameters"""
+    executed = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            executed.append((statement, parameters))
+    
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    
+    connection = db.connection()
+    return [
+        "\n".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+        for statement, parameters in executed
+    ]
+
+def assert_no_table_scans(plans):
+    """No plan reads the expenses, rollup or budget tables row by row"""
+    for plan in plans:
+        for line in plan.splitlines():
+            if line.startswith("SCAN") and any(
+                table in line.split() for table in ("expenses", "expense_daily_rollups", "budgets")
+            ):
+                assert "INDEX" in line, plan
+
+@pytest.mark.parametrize("filtered_by_category, index", [
+    (False, "ix_expenses_user_id_date"),
+    (True, "ix_expenses_user_id_category_id_date"),
+])
+def test_expense_listing_uses_composite_index(engine, db, data, filtered_by_category, index):
+    user_id, category_id = data
+    
+    plans = executed_plans(engine, db, lambda: get_expenses(
+        db, user_id, category_id=category_id if filtered_by_category else None, start_date=START, end_date=END
+    ))
+    
+    assert len(plans) == 1
+    assert f"INDEX {index}" in plans[0]
+    assert_no_table_scans(plans)
+
+@pytest.mark.parametrize("aggregate", [
+    lambda db, user_id: get_expense_summary(db, user_id, START, END),
+    lambda db, user_id: get_expenses_by_category(db, user_id, START, END),
+    lambda db, user_id: get_monthly_expenses(db, user_id),
+], ids=["summary", "by-category", "monthly"])
+def test_analytics_read_rollup_and_edges_through_indexes(engine, db, data, aggregate):
+    user_id, _ = data
+    
+    plans = executed_plans(engine, db, lambda: aggregate(db, user_id))
+    
+    assert any("expense_daily_rollups" in plan for plan in plans)
+    assert_no_table_scans(plans)
+
+def test_range_aggregates_read_edge_days_by_index(engine, db, data):
+    user_id, _ = data
+    
+    plans = executed_plans(engine, db, lambda: get_expense_summary(db, user_id, START, END))
+    
+    assert any("INDEX ix_expenses_user_id_date" in plan for plan in plans)
+
+@pytest.mark.parametrize("single", [False, True])
+def test_budget_progress_uses_composite_indexes(engine, db, data, single):
+    user_id, _ = data
+    budget_id = db.query(Budget.id).first()[0]
+    call = (lambda: get_budget_progress(db, budget_id, user_id)) if single else \
+        (lambda: get_all_budget_progress(db, user_id))
+    
+    plans = executed_plans(engine, db, call)
+    
+    assert len(plans) == 1
+    assert "INDEX ix_expenses_user_id" in plans[0]
+    if not single:
+        assert "INDEX ix_budgets_user_id_is_active_start_date" in plans[0]
+    assert_no_table_scans(plans)
+
+def test_migration_creates_and_drops_the_model_indexes(engine):
+    spec = importlib.util.spec_from_file_location("composite_indexes", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    
+    def indexes(connection):
+        inspector = inspect(connection)
+        return {
+            index["name"]: (table, index["column_names"])
+            for table in ("expenses", "budgets", "categories")
+            for index in inspector.get_indexes(table) if index["name"] in INDEXES
+        }
+    
+    with engine.begin() as connection:
+        # Start from the tables as they were before the migration
+        for name, (table, _) in INDEXES.items():
+            connection.exec_driver_sql(f"DROP INDEX {name}")
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+            assert indexes(connection) == INDEXES
+            migration.downgrade()
+            assert indexes(connection) == {}
+    
+    # The models declare the same indexes, so autogenerate stays in sync
+    for name, (table, columns) in INDEXES.items():
+        model_indexes = {index.name: [column.name for column in index.columns]
+                         for index in Base.metadata.tables[table].indexes}
+        assert model_indexes[name] == columns
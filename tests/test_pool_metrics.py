@@ -0,0 +1,20 @@
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.pool_metrics import PoolMetrics, pool_status
+from app.core.stats import wait_percentiles
+
+def test_wait_percentiles():
+    assert wait_percentiles([]) == {"wait_ms_p50": 0.0, "wait_ms_p95": 0.0, "wait_ms_p99": 0.0}
+    assert wait_percentiles([i / 1000 for i in range(101, 0, -1)]) == {
+        "wait_ms_p50": 51.0, "wait_ms_p95": 96.0, "wait_ms_p99": 100.0
+    }
+
+def test_pool_status_reports_configured_overflow(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=2, max_overflow=3)
+    with engine.connect():
+        status = pool_status(engine, PoolMetrics(), max_overflow=3)
+    
+    assert status["class"] == "QueuePool"
+    assert (status["size"], status["checked_out"], status["max_overflow"]) == (2, 1, 3)
+    assert "wait_ms_p99" in status
@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.profiling import ProfilingMiddleware
+
+# Threads that ran the async endpoint, i.e. the event loop
+loop_threads = []
+
+def make_client(tmp_path, **options):
+    app = FastAPI()
+    
+    @app.get("/ping")
+    async def ping():
+        loop_threads.append(threading.current_thread())
+        return {"ok": True}
+    
+    app.add_middleware(ProfilingMiddleware, profile_dir=str(tmp_path), **options)
+    return TestClient(app)
+
+@pytest.mark.parametrize("options, headers, profiled", [
+    ({}, {"X-Profile": "1"}, False),
+    ({"token": "secret"}, {"X-Profile": "secret"}, True),
+    ({"token": "secret"}, {"X-Profile": "wrong"}, False),
+    ({"token": "secret"}, {}, False),
+    ({"sample_rate": 1.0}, {}, True),
+])
+def test_header_profiles_need_the_token(tmp_path, options, headers, profiled):
+    response = make_client(tmp_path, **options).get("/ping", headers=headers)
+    
+    assert response.status_code == 200
+    assert ('profile;desc="' in response.headers["Server-Timing"]) == profiled
+    assert len(list(tmp_path.iterdir())) == profiled
+
+def test_profile_is_written_off_the_event_loop(tmp_path, monkeypatch):
+    dump = ProfilingMiddleware._dump
+    threads = []
+    
+    def recording_dump(self, profiler, scope):
+        threads.append(threading.current_thread())
+        return dump(self, profiler, scope)
+    
+    monkeypatch.setattr(ProfilingMiddleware, "_dump", recording_dump)
+    client = make_client(tmp_path, token="secret")
+    response = client.get("/ping", headers={"X-Profile": "secret"})
+    
+    assert response.status_code == 200
+    assert len(threads) == 1
+    assert threads[0] is not loop_threads[-1]
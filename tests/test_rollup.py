@@ -0,0 +1,68 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.models.expense import Expense
+from app.models.expense_rollup import ExpenseDailyRollup
+from app.services.rollup import refresh_daily_rollup
+
+def add_expenses(db, user, category, *dates_and_amounts):
+    for day, amount in dates_and_amounts:
+        db.add(Expense(amount=amount, date=day, user_id=user.id, category_id=category.id))
+    db.flush()
+
+def get_rollup(db, user, category, day):
+    db.expire_all()
+    return db.get(ExpenseDailyRollup, (user.id, category.id, day))
+
+def test_refresh_creates_updates_and_drops_the_bucket(db, user, category):
+    add_expenses(db, user, category, (datetime(2024, 3, 1, 9), 10), (datetime(2024, 3, 1, 18), 30))
+    
+    refresh_daily_rollup(db, user.id, category.id, date(2024, 3, 1))
+    rollup = get_rollup(db, user, category, date(2024, 3, 1))
+    assert (rollup.total, rollup.count, rollup.min_amount, rollup.max_amount) == (40, 2, 10, 30)
+    
+    db.query(Expense).filter(Expense.amount == 30).delete()
+    refresh_daily_rollup(db, user.id, category.id, date(2024, 3, 1))
+    rollup = get_rollup(db, user, category, date(2024, 3, 1))
+    assert (rollup.total, rollup.count, rollup.min_amount, rollup.max_amount) == (10, 1, 10, 10)
+    
+    db.query(Expense).delete()
+    refresh_daily_rollup(db, user.id, category.id, date(2024, 3, 1))
+    assert get_rollup(db, user, category, date(2024, 3, 1)) is None
+
+@pytest.mark.parametrize("execution_mode", ["async", "threadpool"])
+@pytest.mark.parametrize("path", ["/api/expenses/summary", "/api/expenses/by-category"])
+def test_aggregates_accept_aware_datetimes(client, auth_headers, category, path):
+    for day in ("2024-01-01T02:00:00", "2024-01-01T12:00:00", "2024-01-02T12:00:00"):
+        response = client.post("/api/expenses/", headers=auth_headers, json={
+            "amount": 10, "date": day, "category_id": category.id
+        })
+        assert response.status_code == 201
+    
+    # 05:00+05:00 is midnight UTC, 07:00+05:00 is 02:00 UTC
+    response = client.get(path, headers=auth_headers, params={
+        "start_date": "2024-01-01T07:00:00+05:00", "end_date": "2024-01-02T23:59:59Z"
+    })
+    
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result if path == "/api/expenses/summary" else result[0])["count"] == 3
+
+@pytest.mark.parametrize("execution_mode", ["async", "threadpool"])
+def test_timeseries_accepts_aware_datetimes(client, auth_headers, category):
+    for day in ("2024-01-01T12:00:00", "2024-01-02T12:00:00", "2024-01-03T12:00:00"):
+        response = client.post("/api/expenses/", headers=auth_headers, json={
+            "amount": 10, "date": day, "category_id": category.id
+        })
+        assert response.status_code == 201
+    
+    response = client.get("/api/expenses/timeseries", headers=auth_headers, params={
+        "granularity": "day", "start_date": "2024-01-01T00:00:00Z", "end_date": "2024-01-03T05:00:00+05:00"
+    })
+    
+    assert response.status_code == 200, response.text
+    # The end bound is midnight UTC, so the noon expense on the 3rd is left out
+    assert [(row["period"], row["count"]) for row in response.json()] == [
+        ("2024-01-01", 1), ("2024-01-02", 1), ("2024-01-03", 0)
+    ]
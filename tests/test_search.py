@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_mock_engine
+from sqlalchemy.orm import Session
+
+from app.models.expense import Expense
+from app.services.expense import _search_query, search_expenses
+from app.utils import text_search
+
+TEXTS = [
+    ("Groceries at the market", "weekly shop"),
+    ("Coffee", "oat flat white"),
+    ("Groceries", None),
+    ("Train ticket", "commute to the market"),
+    ("Dinner", "said \"thanks\" to the waiter"),
+    (None, "flat-white beans"),
+]
+
+@pytest.fixture
+def expenses(db, user, category):
+    for day, (description, note) in enumerate(TEXTS, start=1):
+        db.add(Expense(amount=day, date=datetime(2024, 1, day), description=description, note=note,
+                       user_id=user.id, category_id=category.id))
+    db.commit()
+    return db.query(Expense).order_by(Expense.id).all()
+
+@pytest.mark.parametrize("q", ["groceries", "market", "mark", "flat white", "at white", "ocer", "wait", "nothing"])
+def test_index_search_matches_a_scan(db, user, expenses, q):
+    scanned = sorted((
+        (text_search.rank(q, f"{expense.description or ''} {expense.note or ''}"), expense.id)
+        for expense in expenses
+    ), reverse=True)
+    
+    results = search_expenses(db, user.id, q)
+    
+    assert [(result.rank, result.id) for result in results] == [match for match in scanned if match[0]]
+
+def test_index_search_applies_filters(db, user, expenses):
+    results = search_expenses(db, user.id, "market", category_id=expenses[0].category_id,
+                              start_date=datetime(2024, 1, 2))
+    
+    assert [result.id for result in results] == [expenses[3].id]
+
+def test_index_is_rebuilt_after_writes(client, auth_headers, category, expenses):
+    assert client.get("/api/expenses/search", headers=auth_headers, params={"q": "bakery"}).json() == []
+    
+    response = client.post("/api/expenses/", headers=auth_headers, json={
+        "amount": 3, "date": "2024-02-01T09:00:00", "description": "Bakery", "category_id": category.id
+    })
+    assert response.status_code == 201
+    
+    results = client.get("/api/expenses/search", headers=auth_headers, params={"q": "bakery"}).json()
+    assert [result["id"] for result in results] == [response.json()["id"]]
+
+def test_cursor_pages_through_tied_ranks(client, auth_headers, db, user, category):
+    for day in range(1, 8):
+        db.add(Expense(amount=day, date=datetime(2024, 2, day), description="Coffee",
+                       user_id=user.id, category_id=category.id))
+    db.commit()
+    
+    ids, cursor = [], None
+    for _ in range(4):
+        params = {"q": "coffee", "limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/expenses/search", headers=auth_headers, params=params)
+        ids += [result["id"] for result in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    
+    assert ids == sorted(ids, reverse=True) and len(set(ids)) == 7
+    assert cursor is None
+
+def test_postgresql_rank_is_double_precision():
+    session = Session(bind=create_mock_engine("postgresql://", lambda *args, **kwargs: None))
+    query = _search_query(session, 1, "coffee", None, None, None, after=[0.0607927, 5])
+    
+    sql = str(query.statement.compile(dialect=session.get_bind().dialect))
+    
+    # The selected rank and the cursor comparison both use the float8 value
+    assert sql.count("CAST(ts_rank(") == 2
+    assert sql.count("AS FLOAT(53)) AS rank") == 1
+    assert "AS FLOAT(53)), expenses.id) < (" in sql
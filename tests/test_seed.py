@@ -0,0 +1,34 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def seed(path, *args):
+    subprocess.run(
+        [sys.executable, "-m", "app.tools.seed", "--database-url", f"sqlite:///{path}", "--create-all",
+         "--users", "2", "--expenses-per-user", "200", *args],
+        env={**os.environ, "PYTHONPATH": ROOT}, cwd=ROOT, capture_output=True, check=True
+    )
+    with sqlite3.connect(path) as connection:
+        expenses = connection.execute(
+            "SELECT amount, date, description, note, payment_method, user_id, category_id FROM expenses ORDER BY id"
+        ).fetchall()
+        budgets = connection.execute(
+            "SELECT name, amount, start_date, end_date, category_id FROM budgets ORDER BY id"
+        ).fetchall()
+    return expenses, budgets
+
+def test_same_seed_and_end_date_give_the_same_data(tmp_path):
+    expenses, budgets = seed(tmp_path / "first.db", "--end-date", "2024-07-01")
+    
+    assert (expenses, budgets) == seed(tmp_path / "second.db", "--end-date", "2024-07-01")
+    assert len(expenses) == 400
+    assert max(date for _, date, *_ in expenses) < "2024-07-01"
+    assert {(start, end) for _, _, start, end, _ in budgets} == {
+        ("2024-01-01 00:00:00.000000", "2024-12-31 23:59:59.000000")
+    }
+
+def test_end_date_defaults_to_a_fixed_day(tmp_path):
+    assert seed(tmp_path / "first.db") == seed(tmp_path / "second.db", "--end-date", "2026-01-01")
@@ -0,0 +1,103 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app import database
+from app.models.budget import Budget
+from app.models.expense import Expense
+
+# 23:00 at UTC-5 on the 1st is 04:00 UTC on the 2nd
+AWARE = "2024-01-01T23:00:00-05:00"
+STORED = "2024-01-02T04:00:00"
+
+@pytest.fixture
+def expense(client, auth_headers, category):
+    response = client.post("/api/expenses/", headers=auth_headers, json={
+        "amount": 10, "date": AWARE, "category_id": category.id
+    })
+    assert response.status_code == 201
+    return response.json()
+
+@pytest.mark.parametrize("execution_mode", ["async", "threadpool"])
+def test_aware_dates_are_stored_as_naive_utc(db, expense, execution_mode):
+    assert expense["date"] == STORED
+    assert db.get(Expense, expense["id"]).date.isoformat() == STORED
+
+def test_aware_dates_in_updates_are_stored_as_naive_utc(client, auth_headers, expense):
+    response = client.put(f"/api/expenses/{expense['id']}", headers=auth_headers,
+                          json={"date": "2024-03-01T12:00:00Z"})
+    assert response.json()["date"] == "2024-03-01T12:00:00"
+    
+    response = client.patch("/api/expenses/bulk", headers=auth_headers, json={
+        "ids": [expense["id"]], "changes": {"date": "2024-03-01T12:00:00+02:00"}
+    })
+    assert response.status_code == 200
+    assert client.get(f"/api/expenses/{expense['id']}", headers=auth_headers).json()["date"] == "2024-03-01T10:00:00"
+
+def test_bulk_import_stores_naive_utc(client, auth_headers, category):
+    response = client.post("/api/expenses/bulk", headers=auth_headers, json=[
+        {"amount": 10, "date": AWARE, "category_id": category.id}
+    ])
+    
+    assert response.json() == {"inserted": 1, "errors": []}
+    assert client.get("/api/expenses/", headers=auth_headers).json()[0]["date"] == STORED
+
+def test_listing_and_aggregates_agree_on_an_aware_range(client, auth_headers, expense):
+    params = {"start_date": "2024-01-01T20:00:00-05:00", "end_date": "2024-01-01T23:59:59-05:00"}
+    
+    listed = client.get("/api/expenses/", headers=auth_headers, params=params).json()
+    summary = client.get("/api/expenses/summary", headers=auth_headers, params=params).json()
+    exported = client.get("/api/expenses/export", headers=auth_headers, params={**params, "format": "ndjson"})
+    
+    assert [row["id"] for row in listed] == [expense["id"]]
+    assert summary["count"] == 1
+    assert len(exported.text.splitlines()) == 1
+
+def test_aware_budget_dates_are_stored_as_naive_utc(client, auth_headers, db):
+    response = client.post("/api/budgets/", headers=auth_headers, json={
+        "amount": 100, "name": "January",
+        "start_date": "2024-01-01T00:00:00+01:00", "end_date": "2024-01-31T23:59:59Z"
+    })
+    
+    assert response.status_code == 201
+    budget = db.get(Budget, response.json()["id"])
+    assert budget.start_date.isoformat() == "2023-12-31T23:00:00"
+    assert budget.end_date.isoformat() == "2024-01-31T23:59:59"
+
+@pytest.mark.parametrize("execution_mode", ["async", "threadpool"])
+def test_no_aware_datetime_reaches_the_driver(engine, client, auth_headers, category, execution_mode):
+    # asyncpg rejects aware values for timestamp without time zone columns. SQLite
+    # binds datetimes as strings, so check the values before bind processing
+    bound = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        bound.extend(
+            value for values in context.compiled_parameters for value in values.values()
+            if isinstance(value, datetime)
+        )
+    
+    cursor = base64.urlsafe_b64encode(json.dumps(["2024-01-02T00:00:00+05:00", 10 ** 6]).encode()).decode()
+    aware = {"start_date": "2024-01-01T00:00:00Z", "end_date": "2024-01-31T00:00:00+02:00"}
+    # In async mode requests run on the async engine's sync core
+    engines = {engine, database.serving_pool[0]}
+    for target in engines:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        client.post("/api/expenses/", headers=auth_headers, json={
+            "amount": 10, "date": AWARE, "category_id": category.id
+        })
+        for path in ["/api/expenses/", "/api/expenses/summary", "/api/expenses/by-category",
+                     "/api/expenses/timeseries", "/api/expenses/search?q=x"]:
+            assert client.get(path, headers=auth_headers, params=aware).status_code == 200
+        assert client.get("/api/expenses/", headers=auth_headers, params={"cursor": cursor}).status_code == 200
+        assert client.patch("/api/expenses/bulk", headers=auth_headers, json={
+            **aware, "changes": {"date": "2024-01-05T00:00:00Z"}
+        }).status_code == 200
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
+    
+    assert bound and all(value.tzinfo is None for value in bound)